@@ -0,0 +1,2 @@
+# Flag Catcher game engine
+from .sim import GameState, step
@@ -0,0 +1,9 @@
+# Usage: python -m flag_catcher [--preset NAME] [options]
+import time
+launch_time = time.perf_counter()  # Startup is timed from here, imports included
+
+import sys
+
+from flag_catcher.game import main
+
+sys.exit(main(launch_time=launch_time))
@@ -0,0 +1,349 @@
+# Batched headless games for training automated players
+#
+# BatchEnv runs many independent games under the default preset's rules of
+# sim.step(), each game being one row of a set of NumPy arrays, so a single
+# call advances every game at once. The interface follows Gym's vector environments:
+# reset() returns observations, step(actions) returns observations, rewards,
+# terminated and truncated flags and an info dict, and games that end are
+# reset on the spot.
+#
+# All games draw from one NumPy generator, so a batch is reproducible from
+# its seed, but its games do not replay the same way as a GameState with
+# that seed.
+#
+# Usage: python -m flag_catcher.batch [--envs N] [--steps N]  (throughput check)
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from .constants import WINDOW_WIDTH, PLAYING_AREA
+from .levels import DEFAULT_DIFFICULTY, LevelConfig, check_difficulty, level_config
+from .sim import (KEY_LEFT, KEY_RIGHT, KEY_UP, KEY_DOWN, FRAME_MS, TICK_MS, GAME_DURATION,
+                  POWER_UP_DURATION, PLAYER_SPEED, BOOST_SPEED, PLAYER_RADIUS, FLAG_RADIUS, MIN_FLAG_SPACING,
+                  OBSTACLE_SPACING)
+from .spawn import SPAWN_ATTEMPTS, box_distance
+from .store import CONTACT_GAP
+from .swept import sweep_circles, sweep_circle_rect_x
+
+# Actions are the movement bits of the KEY_* input mask
+NUM_ACTIONS = 16
+
+# Per flag: x, y, captured; per obstacle: x, y, width, height, present
+FLAG_FEATURES = 3
+OBSTACLE_FEATURES = 5
+
+
+class BatchEnv:
+    def __init__(self, num_envs, seed=None, difficulty=DEFAULT_DIFFICULTY, dt=TICK_MS, frame_skip=1):
+        check_difficulty(difficulty)
+        self.num_envs = num_envs
+        self.difficulty = difficulty
+        self.num_flags = difficulty.flags_per_level
+        self.max_obstacles = difficulty.max_obstacles
+        self.dt = dt
+        self.frame_skip = frame_skip
+        self.rng = np.random.default_rng(seed)
+        self.observation_size = 4 + self.num_flags * FLAG_FEATURES + self.max_obstacles * OBSTACLE_FEATURES
+        self.num_actions = NUM_ACTIONS
+
+        n, f, m = num_envs, self.num_flags, self.max_obstacles
+        self.player_x = np.zeros(n)
+        self.player_y = np.zeros(n)
+        self.player_speed = np.zeros(n)
+        self.level = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.time = np.zeros(n)
+        self.power_up_active = np.zeros(n, dtype=bool)
+        self.power_up_timer = np.zeros(n)
+
+        self.flag_x = np.zeros((n, f))
+        self.flag_y = np.zeros((n, f))
+        self.flag_speed_x = np.zeros((n, f))
+        self.flag_speed_y = np.zeros((n, f))
+        self.flag_points = np.zeros((n, f), dtype=np.int64)
+        self.flag_captured = np.zeros((n, f), dtype=bool)
+
+        # Unused obstacle slots have no size, no speed and present == False
+        self.obstacle_x = np.zeros((n, m))
+        self.obstacle_y = np.zeros((n, m))
+        self.obstacle_width = np.zeros((n, m))
+        self.obstacle_height = np.zeros((n, m))
+        self.obstacle_speed_x = np.zeros((n, m))
+        self.obstacle_speed_y = np.zeros((n, m))
+        self.obstacle_present = np.zeros((n, m), dtype=bool)
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self._reset_rows(np.arange(self.num_envs))
+        return self.observe()
+
+    def _reset_rows(self, rows):
+        self.player_x[rows] = WINDOW_WIDTH // 2
+        self.player_y[rows] = PLAYING_AREA // 2
+        self.player_speed[rows] = PLAYER_SPEED
+        self.level[rows] = 1
+        self.score[rows] = 0
+        self.time[rows] = 0
+        self.power_up_active[rows] = False
+        self.power_up_timer[rows] = 0
+        self._spawn_obstacles(rows)
+        self._spawn_flags(rows)
+
+    def _level_configs(self, rows):
+        # levels.level_config of each given game, as a LevelConfig of column
+        # arrays, so every game follows the same level table as GameState
+        configs = [level_config(level, self.difficulty) for level in self.level[rows].tolist()]
+        return LevelConfig(*(np.array(column)[:, None] for column in zip(*configs)))
+
+    def _spawn_flags(self, rows):
+        # Same distributions as create_flags, for every row in rows at once.
+        # Flags that land on an obstacle, within the player's capture reach
+        # or closer than MIN_FLAG_SPACING to an earlier flag of their game
+        # are drawn again, like the candidates spawn.Spawner turns down; any
+        # still blocked after SPAWN_ATTEMPTS draws start out captured, which
+        # is to say left out.
+        rng = self.rng
+        config = self._level_configs(rows)
+        shape = (len(rows), self.num_flags)
+        x = rng.integers(30, WINDOW_WIDTH - 30, shape, endpoint=True)
+        y = rng.integers(30, PLAYING_AREA - 30, shape, endpoint=True)
+        bad = self._flags_blocked(rows, x, y)
+        for _ in range(SPAWN_ATTEMPTS):
+            if not np.any(bad):
+                break
+            x[bad] = rng.integers(30, WINDOW_WIDTH - 30, np.count_nonzero(bad), endpoint=True)
+            y[bad] = rng.integers(30, PLAYING_AREA - 30, np.count_nonzero(bad), endpoint=True)
+            bad = self._flags_blocked(rows, x, y)
+        self.flag_x[rows] = x
+        self.flag_y[rows] = y
+
+        # Add chance for bonus flags in higher levels
+        bonus = rng.random(shape) < config.bonus_chance
+        speed_mult = np.where(bonus, config.bonus_speed, config.flag_speed)
+        self.flag_points[rows] = np.where(bonus, 100, 50)
+        self.flag_speed_x[rows] = rng.uniform(-1.5, 1.5, shape) * speed_mult
+        self.flag_speed_y[rows] = rng.uniform(-1.5, 1.5, shape) * speed_mult
+        self.flag_captured[rows] = bad
+
+    def _spawn_obstacles(self, rows):
+        # Same distributions as create_obstacles. Obstacles closer than
+        # OBSTACLE_SPACING to the player or to an earlier obstacle of their
+        # game are drawn again; any still too close after SPAWN_ATTEMPTS
+        # draws are left out.
+        rng = self.rng
+        d = self.difficulty
+        config = self._level_configs(rows)
+        shape = (len(rows), self.max_obstacles)
+        present = np.arange(self.max_obstacles) < config.obstacles
+        width = rng.integers(d.obstacle_min_size, d.obstacle_max_size, shape, endpoint=True)
+        height = rng.integers(d.obstacle_min_size, d.obstacle_max_size, shape, endpoint=True)
+        speed = config.obstacle_speed
+        x = rng.integers(50, WINDOW_WIDTH - width - 50, endpoint=True)
+        y = rng.integers(50, PLAYING_AREA - height - 50, endpoint=True)
+        bad = self._obstacles_crowded(rows, x, y, width, height, present)
+        for _ in range(SPAWN_ATTEMPTS):
+            if not np.any(bad):
+                break
+            x[bad] = rng.integers(50, WINDOW_WIDTH - width[bad] - 50, endpoint=True)
+            y[bad] = rng.integers(50, PLAYING_AREA - height[bad] - 50, endpoint=True)
+            bad = self._obstacles_crowded(rows, x, y, width, height, present)
+        present &= ~bad
+        self.obstacle_x[rows] = x
+        self.obstacle_y[rows] = y
+        self.obstacle_width[rows] = np.where(present, width, 0)
+        self.obstacle_height[rows] = np.where(present, height, 0)
+        self.obstacle_speed_x[rows] = np.where(present, rng.uniform(-1, 1, shape) * speed, 0.0)
+        self.obstacle_speed_y[rows] = np.where(present, rng.uniform(-1, 1, shape) * speed, 0.0)
+        self.obstacle_present[rows] = present
+
+    def _flags_blocked(self, rows, x, y):
+        # Flags of the given rows that are within FLAG_RADIUS of an obstacle,
+        # within the player's capture reach or too close to an earlier flag
+        distance = box_distance(x[:, :, None], y[:, :, None], 0, 0,
+                                 self.obstacle_x[rows][:, None], self.obstacle_y[rows][:, None],
+                                 self.obstacle_width[rows][:, None], self.obstacle_height[rows][:, None])
+        on_obstacle = np.any(self.obstacle_present[rows][:, None] & (distance < FLAG_RADIUS), axis=2)
+        near_player = np.hypot(x - self.player_x[rows][:, None],
+                               y - self.player_y[rows][:, None]) < PLAYER_RADIUS + FLAG_RADIUS
+        near_flag = np.hypot(x[:, :, None] - x[:, None], y[:, :, None] - y[:, None]) < MIN_FLAG_SPACING
+        earlier = np.tri(self.num_flags, k=-1, dtype=bool)
+        return on_obstacle | near_player | np.any(near_flag & earlier, axis=2)
+
+    def _obstacles_crowded(self, rows, x, y, width, height, present):
+        # Obstacles closer than OBSTACLE_SPACING to the player or to an
+        # earlier obstacle of the same game
+        near_player = box_distance(x, y, width, height, self.player_x[rows][:, None],
+                                    self.player_y[rows][:, None], 0, 0) < OBSTACLE_SPACING
+        near_obstacle = box_distance(x[:, :, None], y[:, :, None], width[:, :, None], height[:, :, None],
+                                      x[:, None], y[:, None], width[:, None], height[:, None]) < OBSTACLE_SPACING
+        earlier = np.tri(self.max_obstacles, k=-1, dtype=bool) & present[:, None]
+        return present & (near_player | np.any(near_obstacle & earlier, axis=2))
+
+    def step(self, actions):
+        # actions: one KEY_* movement mask per game. Returns observations,
+        # rewards (points scored), terminated, truncated and an info dict
+        # holding each game's final score and level; games that ended are
+        # already reset in the returned observations.
+        actions = np.asarray(actions)
+        rewards = np.zeros(self.num_envs, dtype=np.int64)
+        terminated = np.zeros(self.num_envs, dtype=bool)
+        for _ in range(self.frame_skip):
+            # Games that ended during an earlier skipped frame sit still
+            rewards += self._tick(actions) * ~terminated
+            terminated |= self.time >= GAME_DURATION
+        info = {'score': self.score.copy(), 'level': self.level.copy()}
+
+        done = np.flatnonzero(terminated)
+        if len(done):
+            self._reset_rows(done)
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        return self.observe(), rewards.astype(np.float32), terminated, truncated, info
+
+    def _tick(self, actions):
+        # One step() of every game; returns the points each scored
+        frames = self.dt / FRAME_MS
+        speed = self.player_speed * frames
+        radius = PLAYER_RADIUS
+        running = self.time < GAME_DURATION
+
+        # Move the player based on the held keys
+        x = self.player_x
+        y = self.player_y
+        prev_x = x.copy()
+        prev_y = y.copy()
+        move = running & (actions & KEY_LEFT != 0) & (x - speed > radius)
+        x -= np.where(move, speed, 0.0)
+        move = running & (actions & KEY_RIGHT != 0) & (x + speed < WINDOW_WIDTH - radius)
+        x += np.where(move, speed, 0.0)
+        move = running & (actions & KEY_UP != 0) & (y - speed > radius)
+        y -= np.where(move, speed, 0.0)
+        move = running & (actions & KEY_DOWN != 0) & (y + speed < PLAYING_AREA - radius)
+        y += np.where(move, speed, 0.0)
+
+        # Stop each player where its path first touches an obstacle and let
+        # it slide along the edge, one axis at a time
+        move_x = x - prev_x
+        move_y = y - prev_y
+        x[:] = prev_x
+        y[:] = prev_y
+        self._slide(x, y, move_x, self.obstacle_x, self.obstacle_y, self.obstacle_width, self.obstacle_height)
+        self._slide(y, x, move_y, self.obstacle_y, self.obstacle_x, self.obstacle_height, self.obstacle_width)
+
+        # Move obstacles
+        moving = running[:, None]
+        self.obstacle_x += np.where(moving, self.obstacle_speed_x * frames, 0.0)
+        self.obstacle_y += np.where(moving, self.obstacle_speed_y * frames, 0.0)
+        bounce = moving & ((self.obstacle_x < 0) | (self.obstacle_x + self.obstacle_width > WINDOW_WIDTH))
+        self.obstacle_speed_x[bounce] *= -1
+        bounce = moving & ((self.obstacle_y < 0) | (self.obstacle_y + self.obstacle_height > PLAYING_AREA))
+        self.obstacle_speed_y[bounce] *= -1
+
+        # Advance the round timer
+        self.time += np.where(running, self.dt, 0.0)
+
+        # Check power-up status
+        expired = self.power_up_active & (self.time - self.power_up_timer > POWER_UP_DURATION)
+        self.power_up_active &= ~expired
+        self.player_speed[expired] = PLAYER_SPEED
+
+        # Move the flags and bounce them off the walls
+        free = moving & ~self.flag_captured
+        flag_prev_x = self.flag_x.copy()
+        flag_prev_y = self.flag_y.copy()
+        self.flag_x += np.where(free, self.flag_speed_x * frames, 0.0)
+        self.flag_y += np.where(free, self.flag_speed_y * frames, 0.0)
+        bounce = free & ((self.flag_x < 20) | (self.flag_x > WINDOW_WIDTH - 20))
+        self.flag_speed_x[bounce] *= -1
+        bounce = free & ((self.flag_y < 40) | (self.flag_y > PLAYING_AREA - 10))
+        self.flag_speed_y[bounce] *= -1
+
+        # Check for flag captures along both paths
+        reach = radius + FLAG_RADIUS
+        toi = sweep_circles(flag_prev_x, flag_prev_y, self.flag_x - flag_prev_x, self.flag_y - flag_prev_y,
+                            prev_x[:, None], prev_y[:, None], (x - prev_x)[:, None], (y - prev_y)[:, None], reach)
+        captured = free & (toi <= 1)
+        self.flag_captured |= captured
+        points = np.sum(self.flag_points * captured, axis=1)
+        self.score += points
+
+        # Chance for power-up on special flag capture
+        lucky = captured & (self.flag_points > 50) & (self.rng.random(captured.shape) < 0.5)
+        boosted = np.any(lucky, axis=1)
+        self.power_up_active |= boosted
+        self.power_up_timer[boosted] = self.time[boosted]
+        self.player_speed[boosted] = BOOST_SPEED
+
+        # Level up every game whose flags are all captured
+        cleared = np.flatnonzero(running & np.all(self.flag_captured, axis=1))
+        if len(cleared):
+            self.level[cleared] += 1
+            fresh = self._level_configs(cleared).new_obstacles[:, 0]
+            if np.any(fresh):
+                self._spawn_obstacles(cleared[fresh])
+            self._spawn_flags(cleared)
+        return points
+
+    def _slide(self, along, across, move, start, side, length, breadth):
+        # Move every player by move along one axis, stopping CONTACT_GAP
+        # short of the first obstacle in the way; see ObstacleStore.slide().
+        # along/across are the player coordinates on and across that axis,
+        # start/side, length/breadth the obstacles' likewise, so one body
+        # serves both axes.
+        a = along[:, None]
+        d = move[:, None]
+        toi = sweep_circle_rect_x(a, across[:, None], d, PLAYER_RADIUS, start, side, length, breadth)
+        toward = d * (start + length / 2 - a) > 0
+        blocking = self.obstacle_present & ((toi > 0) | toward)
+        toi = np.min(np.where(blocking, toi, np.inf), axis=1, initial=np.inf)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = np.where(toi <= 1, np.maximum(toi - CONTACT_GAP / np.abs(move), 0.0), 1.0)
+        along += move * t
+
+    def observe(self):
+        # Float32 features per game, positions scaled to 0..1
+        n = self.num_envs
+        flags = np.stack((self.flag_x / WINDOW_WIDTH, self.flag_y / PLAYING_AREA, self.flag_captured), axis=2)
+        obstacles = np.stack((self.obstacle_x / WINDOW_WIDTH, self.obstacle_y / PLAYING_AREA,
+                              self.obstacle_width / WINDOW_WIDTH, self.obstacle_height / PLAYING_AREA,
+                              self.obstacle_present), axis=2)
+        return np.concatenate((
+            (self.player_x / WINDOW_WIDTH)[:, None],
+            (self.player_y / PLAYING_AREA)[:, None],
+            (1 - self.time / GAME_DURATION)[:, None],
+            self.power_up_active[:, None],
+            flags.reshape(n, -1),
+            obstacles.reshape(n, -1),
+        ), axis=1, dtype=np.float32)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Step a batch of headless games with random actions")
+    parser.add_argument("--envs", type=int, default=1024, help="games stepped together (default: %(default)s)")
+    parser.add_argument("--steps", type=int, default=2000, help="batch steps to run (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="batch seed (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    env = BatchEnv(args.envs, seed=args.seed)
+    env.reset()
+    rng = np.random.default_rng(args.seed)
+    episodes = 0
+    scores = []
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        _, _, terminated, _, info = env.step(rng.integers(0, NUM_ACTIONS, args.envs))
+        episodes += int(np.count_nonzero(terminated))
+        scores.extend(info['score'][terminated].tolist())
+    elapsed = time.perf_counter() - start
+
+    steps = args.envs * args.steps
+    print(f"{steps} game ticks in {elapsed:.3f}s ({steps / max(elapsed, 1e-9):.0f} ticks/s)")
+    if scores:
+        print(f"{episodes} games finished, mean score {sum(scores) / len(scores):.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,260 @@
+# Per-frame hot path benchmarks for every game preset
+#
+# Each rules preset is set up as a Game under SDL's dummy video driver, so
+# every version of the game is measured on the same engine and renderer.
+# The pieces a frame is made of are timed in isolation at scaled entity
+# counts, followed by a whole frame, and the results are written as JSON so
+# runs can be compared over time. The memory each kind of entity takes is
+# measured with tracemalloc and reported alongside.
+#
+# Usage: python -m flag_catcher.bench [--presets NAME ...] [--quality TIER] [--output FILE]
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import numpy as np
+import pygame
+
+from .constants import WINDOW_WIDTH, WINDOW_HEIGHT, PLAYING_AREA, FLAG_COLORS, WHITE
+from .game import Game
+from .presets import PRESETS
+from .quality import QUALITY_TIERS, QualityController
+from .sim import FLAG_RADIUS, FRAME_MS, TICK_MS, create_flags, step
+from .sprites import SpriteAtlas
+from .store import MAX_PARTICLES, ObstacleStore, ParticleStore
+
+FLAG_COUNTS = [6, 60, 600, 6000]
+OBSTACLE_COUNTS = [0, 5, 50, 500]
+
+# Flag counts from which the spatial-hash variants of the queries are timed too
+GRID_FLAG_COUNT = 600
+
+# Entities built per kind when measuring memory
+MEMORY_COUNT = 10000
+
+# Player position used for capture and collision queries
+PLAYER = (WINDOW_WIDTH // 2, PLAYING_AREA // 2, 25)
+
+
+# Time fn repeatedly for at least min_time seconds; returns per-call stats
+def measure(fn, min_time, min_iterations=3):
+    fn()  # Warm up caches and lazily built sprites
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < min_iterations or time.perf_counter() < deadline:
+        start = time.perf_counter_ns()
+        fn()
+        samples.append((time.perf_counter_ns() - start) / 1000)
+    samples.sort()
+    return {
+        'iterations': len(samples),
+        'mean_us': round(statistics.fmean(samples), 2),
+        'median_us': round(statistics.median(samples), 2),
+        'min_us': round(samples[0], 2),
+        'p95_us': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2),
+    }
+
+
+# Bytes allocated per entity while build(count) runs, counting everything
+# the entities keep alive
+def measure_memory(build, count):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        entities = build(count)
+        used = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del entities
+    return round(used / count, 1)
+
+
+def random_rects(count, rng):
+    widths = rng.integers(30, 61, count)
+    heights = rng.integers(30, 61, count)
+    xs = rng.uniform(0, WINDOW_WIDTH - widths)
+    ys = rng.uniform(0, PLAYING_AREA - heights)
+    return xs, ys, widths, heights
+
+
+# Entity builders for the memory benchmark; every preset shares the same stores
+def entity_memory():
+    rng = np.random.default_rng(0)
+    builders = {
+        'flag': lambda count: create_flags(3, count, rng=random.Random(count)),
+        'obstacle': lambda count: ObstacleStore(*random_rects(count, rng), np.zeros(count), np.zeros(count)),
+        'particle': ParticleStore,
+    }
+    return builders
+
+
+# Benchmarks for one preset, drawn by a Game playing by its rules
+def preset_benchmarks(game, flag_count, obstacle_count):
+    rng = np.random.default_rng(flag_count * 1000 + obstacle_count)
+    screen = game.screen
+    state = game.state
+    player_x, player_y, player_radius = PLAYER
+    benches = {}
+
+    def make_flags():
+        return create_flags(3, flag_count, rng=random.Random(flag_count))
+
+    def make_obstacles():
+        xs, ys, widths, heights = random_rects(obstacle_count, rng)
+        speeds = rng.uniform(-1, 1, (2, obstacle_count)) * 1.1
+        return ObstacleStore(xs, ys, widths, heights, speeds[0], speeds[1])
+
+    flags = make_flags()
+    obstacles = make_obstacles()
+
+    def check_flags():
+        flags.capture(player_x, player_y, player_radius + 10)
+        flags.captured[:] = False
+    benches['flags_capture'] = check_flags
+    benches['flags_move'] = lambda: flags.move(1.0)
+    benches['flags_bounce'] = lambda: flags.bounce(obstacles, FLAG_RADIUS)
+    benches['flags_draw'] = lambda: game.draw_flags(flags, 1.0)
+
+    background = game.background
+
+    def draw_background():
+        background.update()
+        background.draw(False)
+    benches['background'] = draw_background
+
+    benches['obstacle_collision'] = lambda: obstacles.check_collision(player_x, player_y, player_radius)
+    benches['obstacle_slide'] = lambda: obstacles.slide(player_x, player_y, 8.0, 8.0, player_radius)
+    benches['obstacles_draw'] = lambda: game.draw_obstacles(obstacles, 1.0)
+
+    # The same queries with the stores tracked in a spatial hash, which
+    # only pays off at high entity counts
+    if flag_count >= GRID_FLAG_COUNT:
+        grid_flags = make_flags()
+        grid_flags.enable_grid()
+        grid_obstacles = make_obstacles()
+        grid_obstacles.enable_grid()
+
+        # Captured flags leave the grid for good, so the warm-up call takes
+        # the flags in reach and the lookup itself is what gets timed
+        benches['flags_capture_grid'] = lambda: grid_flags.capture(player_x, player_y, player_radius + 10)
+        benches['flags_move_grid'] = lambda: grid_flags.move(1.0)
+        benches['obstacle_collision_grid'] = lambda: grid_obstacles.check_collision(player_x, player_y,
+                                                                                    player_radius)
+        benches['obstacle_slide_grid'] = lambda: grid_obstacles.slide(player_x, player_y, 8.0, 8.0,
+                                                                      player_radius)
+    benches['player_draw'] = lambda: game.player.draw(screen)
+
+    # A pool big enough that the scaled bursts all fit
+    particles = game.particles = ParticleStore(max(MAX_PARTICLES, max(1, flag_count // 6) * 10))
+    for _ in range(max(1, flag_count // 6)):
+        particles.emit(350, 300, FLAG_COLORS[0], game.quality.tier.particles, lifetime=10 ** 9)
+
+    def run_effects():
+        particles.update()
+        game.draw_particles(particles)
+    benches['effects'] = run_effects
+
+    font = game.font
+    text_cache = game.text_cache
+
+    def draw_hud():
+        for text in ("Level: 3", "Score: 1250", "Time: 42s", "Flags: 4"):
+            screen.blit(text_cache.render(font, text, True, WHITE), (50, PLAYING_AREA + 100))
+    benches['hud_text'] = draw_hud
+
+    # A frame at 60 FPS runs two 120 Hz ticks, then draws and presents
+    state.flags = make_flags()
+    state.obstacles = make_obstacles()
+
+    def full_frame():
+        for _ in range(round(FRAME_MS / TICK_MS)):
+            game.handle(step(state, 0, TICK_MS))
+        if state.game_over:
+            state.game_over = False
+            state.time = 0
+        game.draw(FRAME_MS, 1.0)
+    benches['frame'] = full_frame
+    return benches
+
+
+def run(presets, flag_counts, obstacle_counts, min_time, quality=QUALITY_TIERS[0].name):
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    atlas = SpriteAtlas()
+    results = []
+    memory = []
+    for entity, build in entity_memory().items():
+        per_entity = measure_memory(build, MEMORY_COUNT)
+        memory.append(dict(entity=entity, count=MEMORY_COUNT, bytes_per_entity=per_entity))
+        print(f"{entity:20} {per_entity:>10.1f} bytes each", file=sys.stderr)
+
+    for name in presets:
+        for flag_count, obstacle_count in zip(flag_counts, obstacle_counts):
+            controller = QualityController()
+            controller.lock(quality)
+            game = Game(screen, atlas, PRESETS[name], seed=0, quality=controller)
+            benches = preset_benchmarks(game, flag_count, obstacle_count)
+            for bench_name, fn in benches.items():
+                stats = measure(fn, min_time)
+                results.append(dict(preset=name, quality=quality, benchmark=bench_name, flags=flag_count,
+                                    obstacles=obstacle_count, **stats))
+                print(f"{name:24} {bench_name:24} flags={flag_count:<5} obstacles={obstacle_count:<4}"
+                      f" median {stats['median_us']:>10.1f} us", file=sys.stderr)
+    return results, memory
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the per-frame hot paths of every game preset")
+    parser.add_argument("--presets", nargs="+", choices=PRESETS, metavar="NAME",
+                        help="presets to benchmark (default: all)")
+    parser.add_argument("--flags", nargs="+", type=int, default=FLAG_COUNTS,
+                        help="flag counts to run at (default: %(default)s)")
+    parser.add_argument("--obstacles", nargs="+", type=int, default=OBSTACLE_COUNTS,
+                        help="obstacle counts paired with --flags (default: %(default)s)")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="seconds to spend timing each benchmark (default: %(default)s)")
+    parser.add_argument("--quality", choices=[tier.name for tier in QUALITY_TIERS], default=QUALITY_TIERS[0].name,
+                        help="render quality tier to draw at (default: %(default)s)")
+    parser.add_argument("--output", metavar="FILE", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+    if len(args.flags) != len(args.obstacles):
+        parser.error("--flags and --obstacles need the same number of values")
+
+    presets = args.presets or list(PRESETS)
+    results, memory = run(presets, args.flags, args.obstacles, args.min_time, args.quality)
+    report = {
+        'meta': {
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'video_driver': os.environ.get('SDL_VIDEODRIVER'),
+            'min_time': args.min_time,
+        },
+        'results': results,
+        'memory': memory,
+    }
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,48 @@
+# Sort-and-sweep broad phase along x
+#
+# SpatialHash answers one query box at a time, which suits the player
+# looking for nearby flags. When every flag is tested against every other
+# flag and every obstacle each tick, sorting once along x and reading the
+# pairs off the sorted order is cheaper: two entities can only touch if
+# their extents overlap along x, and after sorting those are neighbours.
+# The cost grows with the number of pairs that are actually close along x
+# rather than with every pair, and all of it runs as NumPy array operations.
+import numpy as np
+
+
+def close_pairs(x, reach):
+    # Index pairs (i, j) of points less than reach apart along x, each
+    # unordered pair once
+    order = np.argsort(x, kind='stable')
+    sorted_x = x[order]
+    # Points after position p that are still within reach of it
+    first = np.arange(1, len(x) + 1)
+    last = np.searchsorted(sorted_x, sorted_x + reach, side='left')
+    owner, position = _runs(first, last - first)
+    return order[owner], order[position]
+
+
+def interval_pairs(x, low, high):
+    # Index pairs (i, k) of points x[i] strictly inside intervals
+    # (low[k], high[k])
+    if len(low) == 0:
+        empty = np.zeros(0, dtype=np.intp)
+        return empty, empty
+    order = np.argsort(low, kind='stable')
+    sorted_low = low[order]
+    # An interval holding x starts after x minus the widest interval and
+    # before x itself
+    first = np.searchsorted(sorted_low, x - np.max(high - low), side='right')
+    last = np.searchsorted(sorted_low, x, side='left')
+    owner, position = _runs(first, np.maximum(last - first, 0))
+    interval = order[position]
+    inside = high[interval] > x[owner]
+    return owner[inside], interval[inside]
+
+
+def _runs(first, counts):
+    # Expand runs of sorted positions first[i] .. first[i] + counts[i] into
+    # flat (i, position) arrays
+    owner = np.repeat(np.arange(len(counts)), counts)
+    offset = np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, np.repeat(first, counts) + offset
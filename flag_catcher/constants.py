@@ -0,0 +1,34 @@
+# Shared dimensions and colours for the Flag Catcher game
+
+# Display dimensions
+WINDOW_WIDTH = 700
+WINDOW_HEIGHT = 800
+PLAYING_AREA = 600
+
+# Colors
+BLACK = (0, 0, 0)
+RED = (255, 0, 0)
+BROWN = (139, 69, 19)
+GRAY = (100, 100, 100)
+WHITE = (255, 255, 255)
+LIGHT_BLUE = (173, 216, 230)
+GOLD = (255, 215, 0)
+GREEN = (0, 128, 0)
+PURPLE = (128, 0, 128)
+FLAG_COLORS = [
+    (255, 255, 0),    # Yellow
+    (0, 255, 0),      # Green
+    (0, 0, 255),      # Blue
+    (255, 0, 255),    # Magenta
+    (0, 255, 255),    # Cyan
+    (255, 165, 0)     # Orange
+]
+
+# Background colors for different levels
+BACKGROUND_COLORS = [
+    (0, 0, 30),      # Dark blue
+    (30, 0, 30),     # Dark purple
+    (30, 30, 0),     # Dark yellow
+    (0, 30, 0),      # Dark green
+    (30, 0, 0),      # Dark red
+]
@@ -0,0 +1,71 @@
+# Dirty-rectangle presentation
+#
+# Instead of flipping the whole window every frame, the renderer collects the
+# rectangles it drew this frame and pushes only those, plus last frame's (so
+# whatever moved away gets erased), to the display. Anything that repaints
+# the whole window, such as a background colour blend, asks for a full flip.
+import pygame
+
+# Past this many rectangles one bounding update is cheaper than many small ones
+MAX_RECTS = 200
+
+
+class DirtyRects:
+    def __init__(self, max_rects=MAX_RECTS):
+        self.max_rects = max_rects
+        self.current = []
+        self.previous = []
+        self.full = True  # The first frame always goes out whole
+        self.settling = False
+
+    def add(self, rects):
+        # Accepts a single Rect or any iterable of them
+        if isinstance(rects, pygame.Rect):
+            self.current.append(rects)
+        else:
+            self.current.extend(rects)
+
+    def invalidate(self):
+        # Next present() flips the whole window
+        self.full = True
+
+    def present(self):
+        if self.full or self.settling:
+            pygame.display.flip()
+
+            # Send one more whole frame after a full one, so anything that was
+            # drawn untracked while the window was repainted gets erased
+            self.settling = self.full
+            self.full = False
+        else:
+            rects = self.previous + self.current
+            if len(rects) > self.max_rects:
+                rects = [rects[0].unionall(rects[1:])]
+            pygame.display.update(rects)
+        self.previous = self.current
+        self.current = []
+
+
+# Text fields in the HUD strip, redrawn only when their text changes
+class HudFields:
+    def __init__(self):
+        self.fields = {}  # name -> (surface, rect)
+
+    def invalidate(self):
+        # Forget what is on screen, e.g. after the strip was repainted whole
+        self.fields.clear()
+
+    def draw(self, screen, name, surface, pos, background_color):
+        # Returns the rectangles that changed, empty if the field is current.
+        # Rendered text comes from the text cache, so an unchanged string is
+        # the very same Surface as last frame.
+        old = self.fields.get(name)
+        if old is not None and old[0] is surface:
+            return []
+        rects = []
+        if old is not None:
+            rects.append(screen.fill(background_color, old[1]))
+        rect = screen.blit(surface, pos)
+        rects.append(rect)
+        self.fields[name] = (surface, rect)
+        return rects
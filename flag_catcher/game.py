@@ -0,0 +1,646 @@
+# Flag Catcher game loop
+#
+# Reads the keyboard (or a replay), runs fixed simulation ticks and draws
+# the game for whichever rules preset it was started with. Everything a
+# version of the game looks like, from the red circle of the first script
+# to the butterfly net over parallax stars of the last, is chosen here from
+# the preset, so every version shares one renderer and one loop. How much
+# cosmetic detail is drawn adapts to how long frames take, see quality.py.
+#
+# Usage: python -m flag_catcher [--preset NAME] [--seed N] [--record FILE | --replay FILE] [--quality TIER]
+
+# Imported ahead of pygame so pygame loads without pkg_resources
+from .startup import LazyFont, StartupTimer, init_pygame
+
+import argparse
+import random
+import sys
+import time
+
+import numpy as np
+import pygame
+
+from .constants import (
+    WINDOW_WIDTH, WINDOW_HEIGHT, PLAYING_AREA,
+    BLACK, RED, GRAY, WHITE, GOLD, GREEN, BACKGROUND_COLORS
+)
+from .dirty import DirtyRects, HudFields
+from .levels import level_config
+from .presets import DEFAULT_PRESET, PRESETS
+from .profiler import FrameProfiler
+from .quality import FRAME_BUDGET_MS, QUALITY_TIERS, QualityController
+from .replay import ReplayError, ReplayReader, ReplayWriter, parse_seed
+from .sim import (
+    GameState, step, KEY_LEFT, KEY_RIGHT, KEY_UP, KEY_DOWN, KEY_PAUSE, KEY_RESET,
+    POWER_UP_DURATION, FRAME_MS, TICK_MS
+)
+from .sprites import SpriteAtlas, FLAG_ORIGIN, NET_ORIGIN, NET_SPOKES
+from .starfield import Starfield
+from .store import ParticleStore
+from .text import TextCache
+from .timestep import FixedTimestep, lerp
+
+# Upper bound on how often frames are drawn; the simulation runs at its own rate
+MAX_RENDER_FPS = 120
+
+# How long the closing message stays up when the rules have no restart
+ENDING_WAIT_MS = 3000
+
+# Row of the HUD strip's text below the playing area
+HUD_STRIP_Y = PLAYING_AREA + (WINDOW_HEIGHT - PLAYING_AREA) // 2
+
+
+# Background elements: plain black, still twinkling stars, or parallax stars
+# over a colour that changes with the level
+class Background:
+    __slots__ = ('screen', 'kind', 'color', 'starfield', 'transition', 'transition_progress', 'next_color',
+                 'prepared_level')
+
+    def __init__(self, screen, atlas, kind='parallax', level=1, star_count=50, rng=random):
+        self.screen = screen
+        self.kind = kind
+        if kind == 'parallax':
+            self.color = BACKGROUND_COLORS[(level - 1) % len(BACKGROUND_COLORS)]
+            self.starfield = Starfield(atlas, star_count, rng=rng)
+        else:
+            self.color = BLACK
+            self.starfield = Starfield(atlas, star_count, rng=rng, scroll_speed=0) if kind == 'stars' else None
+        self.transition = False
+        self.transition_progress = 0
+        self.next_color = None
+        self.prepared_level = None
+
+    def prepare(self, next_level):
+        # Pick the colour the next level blends to ahead of time; the stars
+        # are baked once and shared by every level, so it is all that changes
+        if self.kind == 'parallax' and not self.transition:
+            self.next_color = BACKGROUND_COLORS[(next_level - 1) % len(BACKGROUND_COLORS)]
+            self.prepared_level = next_level
+
+    def start_transition(self, next_level):
+        if self.kind != 'parallax':
+            return
+        if self.prepared_level != next_level:
+            self.prepare(next_level)
+        self.transition = True
+        self.transition_progress = 0
+        self.prepared_level = None
+
+    def update(self, frames=1.0):
+        # Move stars for parallax effect
+        if self.starfield is not None:
+            self.starfield.update(frames)
+
+        # Update transition if active
+        if self.transition:
+            self.transition_progress += 0.02 * frames
+            if self.transition_progress >= 1:
+                self.color = self.next_color
+                self.transition = False
+                self.transition_progress = 0
+
+    @property
+    def scrolling(self):
+        return self.starfield is not None and self.starfield.scroll_speed != 0
+
+    def draw(self, full=True, erase=()):
+        # Draw background color and return the rectangles drawn. Outside full
+        # repaints the HUD strip keeps what is already there, and a scrolling
+        # starfield clears the whole playing area while a still background
+        # only clears the erase rectangles, what was drawn over it last frame.
+        if not full and not self.scrolling:
+            playing_area = pygame.Rect(0, 0, WINDOW_WIDTH, PLAYING_AREA)
+            rects = [rect for rect in (playing_area.clip(rect) for rect in erase) if rect]
+            for rect in rects:
+                self.screen.fill(self.color, rect)
+            if self.starfield is None:
+                return []
+            return self.starfield.restore(self.screen, rects)
+
+        area = None if full else (0, 0, WINDOW_WIDTH, PLAYING_AREA)
+        if self.transition:
+            # Blend between colors during transition
+            r = int(self.color[0] * (1 - self.transition_progress) + self.next_color[0] * self.transition_progress)
+            g = int(self.color[1] * (1 - self.transition_progress) + self.next_color[1] * self.transition_progress)
+            b = int(self.color[2] * (1 - self.transition_progress) + self.next_color[2] * self.transition_progress)
+            rect = self.screen.fill((r, g, b), area)
+        else:
+            rect = self.screen.fill(self.color, area)
+
+        # Draw the stars
+        if self.starfield is None:
+            return [rect]
+        return self.starfield.draw(self.screen)
+
+
+# Butterfly net class
+class ButterflyNet:
+    __slots__ = ('atlas', 'x', 'y', 'radius', 'handle_length', 'animation_frame', 'animation_speed', 'power_up',
+                 'power_up_time', 'spokes')
+
+    def __init__(self, atlas, x, y):
+        self.atlas = atlas
+        self.x = x
+        self.y = y
+        self.radius = 25
+        self.handle_length = 40
+        self.animation_frame = 0
+        self.animation_speed = 0.2
+        self.power_up = False
+        self.power_up_time = 0
+        self.spokes = NET_SPOKES
+
+    def update(self, frames=1.0):
+        self.animation_frame += self.animation_speed * frames
+
+    def draw(self, screen):
+        sprite = self.atlas.net(self.power_up, self.animation_frame, self.spokes)
+        return screen.blit(sprite, (int(self.x) - NET_ORIGIN[0], int(self.y) - NET_ORIGIN[1]))
+
+
+# The red circle the first versions of the game were played with
+class Circle:
+    __slots__ = ('x', 'y', 'radius', 'power_up', 'spokes')
+
+    def __init__(self, x, y, radius=20):
+        self.x = x
+        self.y = y
+        self.radius = radius
+        self.power_up = False
+        self.spokes = 0
+
+    def update(self, frames=1.0):
+        pass
+
+    def draw(self, screen):
+        return pygame.draw.circle(screen, RED, (int(self.x), int(self.y)), self.radius)
+
+
+# Read the keys the simulation cares about into an input bitmask
+def read_keys(pause_pressed):
+    pressed = pygame.key.get_pressed()
+    keys = 0
+    if pressed[pygame.K_LEFT]:
+        keys |= KEY_LEFT
+    if pressed[pygame.K_RIGHT]:
+        keys |= KEY_RIGHT
+    if pressed[pygame.K_UP]:
+        keys |= KEY_UP
+    if pressed[pygame.K_DOWN]:
+        keys |= KEY_DOWN
+    if pressed[pygame.K_r]:
+        keys |= KEY_RESET
+    if pause_pressed:
+        keys |= KEY_PAUSE
+    return keys
+
+
+# One game played by a preset's rules and everything that draws it.
+# Cosmetic randomness has its own stream so how often frames are drawn never
+# shifts the simulation.
+class Game:
+    def __init__(self, screen, atlas, rules, seed=None, star_count=50, profiler=None, quality=None):
+        self.screen = screen
+        self.atlas = atlas
+        self.rules = rules
+        self.star_count = star_count
+        self.state = GameState(seed, rules)
+        self.visual_rng = random.Random(f"{self.state.seed}:visual")
+        self.background = Background(screen, atlas, rules.background, 1, star_count, self.visual_rng)
+        if rules.net:
+            self.player = ButterflyNet(atlas, self.state.player_x, self.state.player_y)
+        else:
+            self.player = Circle(self.state.player_x, self.state.player_y, rules.player_radius)
+        self.particles = ParticleStore()  # Capture effect particles
+        self.font = LazyFont(36)  # Bundled default font, loaded when first drawn
+        self.large_font = LazyFont(72)
+        self.text_cache = TextCache()  # Rendered HUD and banner strings
+        self.preloaded_level = None  # Level whose banner is already rendered
+        self.pending_level = None  # Level whose background transition starts after this frame
+        self.dirty = DirtyRects()  # Screen areas to push to the display this frame
+        self.hud = HudFields()  # Score, timer and flag counters in the bottom strip
+        self.profiler = profiler or FrameProfiler(LazyFont(20), MAX_RENDER_FPS)
+        self.quality = quality or QualityController()  # Detail drawn, adjusted to the frame time
+        self.quality.add_listener(self.apply_quality)
+        self.apply_quality(self.quality.tier)
+
+    def apply_quality(self, tier, decision=None):
+        if self.background.starfield is not None:
+            self.background.starfield.set_detail(tier.star_bands, tier.twinkle)
+            self.dirty.invalidate()  # Stars shown or hidden anywhere in the playing area
+        self.player.spokes = tier.net_spokes
+
+    def handle(self, sim_events):
+        # React to what the simulation reported this tick
+        for sim_event in sim_events:
+            if sim_event[0] == 'capture':
+                count = self.quality.tier.particles
+                if self.rules.effects and count:
+                    _, x, y, color = sim_event
+                    self.particles.emit(x, y, color, count, rng=self.visual_rng)
+            elif sim_event[0] == 'level_up':
+                # Start background transition to next level once this frame is out
+                self.pending_level = sim_event[1]
+            elif sim_event[0] == 'reset':
+                self.background = Background(self.screen, self.atlas, self.rules.background, self.state.level,
+                                             self.star_count, self.visual_rng)
+                self.apply_quality(self.quality.tier)
+                self.particles.clear()
+                self.pending_level = None
+                self.preloaded_level = None  # The new background has nothing prepared
+
+    def preload_level(self, level):
+        # Get what the level's first frames draw ready ahead of time: the
+        # banner and flag counter text, so those frames only blit them, and
+        # the background colour to blend to. Sprites are all rendered up
+        # front by the atlas, and the simulation lays out the level itself,
+        # see sim.NextLevel.
+        self.text_cache.render(self.font, f"Level: {level}", True, GREEN)
+        if self.rules.flags_counter:
+            self.flags_text(level_config(level, self.state.difficulty).flags)
+        self.background.prepare(level)
+        self.preloaded_level = level
+
+    # Draw the flags from the simulation, interpolated between the last two ticks
+    def draw_flags(self, flags, alpha):
+        active = np.flatnonzero(~flags.captured)
+        xs = (lerp(flags.prev_x[active], flags.x[active], alpha) - FLAG_ORIGIN[0]).astype(int).tolist()
+        ys = (lerp(flags.prev_y[active], flags.y[active], alpha) - FLAG_ORIGIN[1]).astype(int).tolist()
+        if self.rules.flag_wave and self.quality.tier.flag_wave:
+            specials = flags.special[active].tolist()
+            angles = flags.angle[active].tolist()
+        elif self.rules.flag_wave:
+            # Still flags that keep their bonus marker
+            specials = flags.special[active].tolist()
+            angles = [0] * len(active)
+        else:
+            # Plain, still flags
+            specials = angles = [0] * len(active)
+        atlas = self.atlas
+        return self.screen.blits([
+            (atlas.flag(color_index, special, angle), (x, y))
+            for x, y, color_index, special, angle in zip(xs, ys, flags.color_index[active].tolist(), specials, angles)
+        ])
+
+    # Draw the obstacles from the simulation, interpolated between the last two ticks
+    def draw_obstacles(self, obstacles, alpha):
+        xs = lerp(obstacles.prev_x, obstacles.x, alpha)
+        ys = lerp(obstacles.prev_y, obstacles.y, alpha)
+        return [pygame.draw.rect(self.screen, GRAY, (x, y, width, height))
+                for x, y, width, height in zip(xs, ys, obstacles.width, obstacles.height)]
+
+    # Draw the capture effect particles
+    def draw_particles(self, particles):
+        n = len(particles)
+        return [pygame.draw.circle(self.screen, color, (x, y), size)
+                for x, y, size, color in zip(particles.x[:n].astype(int), particles.y[:n].astype(int),
+                                             particles.size[:n].astype(int), particles.color[:n].tolist())]
+
+    def flags_text(self, count):
+        label = "Flags" if self.rules.hud == 'strip' else "Flags Remaining"
+        return self.text_cache.render(self.font, f"{label}: {count}", True, WHITE)
+
+    def draw_hud(self):
+        # HUD fields below the playing area are only redrawn when they change
+        state = self.state
+        rules = self.rules
+        text_cache = self.text_cache
+        font = self.font
+        color = self.background.color
+        rects = []
+        score_text = text_cache.render(font, f"Score: {state.score}", True, WHITE)
+        timer_text = None
+        if state.time_left is not None:
+            timer_text = text_cache.render(font, f"Time: {int(state.time_left) // 1000}s", True, WHITE)
+        flags_left = len(state.flags) - state.flags_captured
+
+        if rules.hud == 'strip':
+            # Score, timer and flags remaining side by side at the bottom
+            rects += self.hud.draw(self.screen, 'score', score_text, (50, HUD_STRIP_Y), color)
+            if timer_text is not None:
+                rects += self.hud.draw(self.screen, 'timer', timer_text, (WINDOW_WIDTH - 150, HUD_STRIP_Y), color)
+            if rules.flags_counter:
+                flags_text = self.flags_text(flags_left)
+                rects += self.hud.draw(self.screen, 'flags', flags_text, (WINDOW_WIDTH // 2 - 40, HUD_STRIP_Y), color)
+        else:
+            # Score and timer just below the playing area, flags remaining under the score
+            rects += self.hud.draw(self.screen, 'score', score_text, (20, PLAYING_AREA + 20), color)
+            if timer_text is not None:
+                rects += self.hud.draw(self.screen, 'timer', timer_text, (WINDOW_WIDTH - 120, PLAYING_AREA + 20),
+                                       color)
+            if rules.flags_counter:
+                flags_text = self.flags_text(flags_left)
+                rects += self.hud.draw(self.screen, 'flags', flags_text, (20, PLAYING_AREA + 60), color)
+        return rects
+
+    def draw_game_over(self):
+        screen = self.screen
+        state = self.state
+        text_cache = self.text_cache
+        font = self.font
+        levels = self.rules.on_clear == 'level'
+        if levels:
+            banner_y, score_y, reset_y = PLAYING_AREA // 2 - 100, PLAYING_AREA // 2 - 20, PLAYING_AREA // 2 + 100
+        else:
+            banner_y, score_y, reset_y = PLAYING_AREA // 2 - 50, PLAYING_AREA // 2 + 20, PLAYING_AREA // 2 + 60
+
+        # Draw game over banner
+        game_over_text = text_cache.render(self.large_font, "GAME OVER", True, RED)
+        screen.blit(game_over_text, (WINDOW_WIDTH // 2 - 150, banner_y))
+
+        # Draw final score
+        final_score_text = text_cache.render(font, f"Final Score: {state.score}", True, WHITE)
+        screen.blit(final_score_text, (WINDOW_WIDTH // 2 - 80, score_y))
+
+        if levels:
+            # Draw high score
+            high_score_text = text_cache.render(font, f"High Score: {state.high_score}", True, GOLD)
+            screen.blit(high_score_text, (WINDOW_WIDTH // 2 - 80, PLAYING_AREA // 2 + 20))
+
+            # Draw level reached
+            level_text = text_cache.render(font, f"Level Reached: {state.level}", True, GREEN)
+            screen.blit(level_text, (WINDOW_WIDTH // 2 - 80, PLAYING_AREA // 2 + 60))
+
+        # Draw reset instruction
+        reset_text = text_cache.render(font, "Press 'R' to play again", True, WHITE)
+        screen.blit(reset_text, (WINDOW_WIDTH // 2 - 120, reset_y))
+
+    def draw_ending(self):
+        # Closing message for rules without a restart; the window closes after it
+        state = self.state
+        if state.flags_captured == len(state.flags):
+            text, x = "Game Over! All flags captured!", WINDOW_WIDTH // 2 - 180
+        else:
+            text, x = "Time's Up! Game Over!", WINDOW_WIDTH // 2 - 150
+        self.screen.blit(self.text_cache.render(self.font, text, True, WHITE), (x, PLAYING_AREA + 50))
+        pygame.display.flip()
+
+    def draw_paused(self):
+        # Draw pause screen
+        pause_text = self.text_cache.render(self.large_font, "PAUSED", True, WHITE)
+        self.screen.blit(pause_text, (WINDOW_WIDTH // 2 - 100, PLAYING_AREA // 2 - 50))
+        pygame.display.flip()
+        self.dirty.invalidate()
+
+    def draw(self, frame_ms, alpha, full_flip=False):
+        # Draw and present one frame; frame_ms is the real time the last one took
+        state = self.state
+        rules = self.rules
+        screen = self.screen
+        dirty = self.dirty
+        profiler = self.profiler
+        background = self.background
+
+        # Cosmetic animation advances with real time, scaled to the original 60 FPS
+        frames = frame_ms / FRAME_MS
+
+        # Repaint and flip the whole window while the background colour blends
+        # (including the frame it settles), on the game-over screen, whenever
+        # a whole flip is due anyway, or when dirty-rect rendering is switched
+        # off
+        full_frame = full_flip or background.transition or state.game_over or dirty.full
+        if full_frame:
+            dirty.invalidate()
+            self.hud.invalidate()
+
+        # Update background
+        background.update(frames)
+
+        # Draw background over what was drawn last frame
+        dirty.add(background.draw(full_frame, dirty.previous))
+
+        # Draw separator line
+        if rules.hud == 'strip':
+            pygame.draw.line(screen, GRAY, (0, PLAYING_AREA), (WINDOW_WIDTH, PLAYING_AREA), 2)
+        profiler.lap('background')
+
+        if not state.game_over:
+            # Update player position
+            player = self.player
+            player.x = lerp(state.prev_player_x, state.player_x, alpha)
+            player.y = lerp(state.prev_player_y, state.player_y, alpha)
+            player.power_up = state.power_up_active
+            player.update(frames)
+
+            # Draw power-up timer
+            if state.power_up_active:
+                power_up_left = POWER_UP_DURATION - (state.time - state.power_up_timer)
+                dirty.add(pygame.draw.rect(screen, GOLD, (WINDOW_WIDTH // 2 - 50, 10,
+                                                        int(100 * power_up_left / POWER_UP_DURATION), 10)))
+
+            # Draw obstacles
+            dirty.add(self.draw_obstacles(state.obstacles, alpha))
+            profiler.lap('obstacles')
+
+            # Update and draw effects
+            if rules.effects:
+                self.particles.update(frames)
+                dirty.add(self.draw_particles(self.particles))
+            profiler.lap('effects')
+
+            # Draw the flags
+            dirty.add(self.draw_flags(state.flags, alpha))
+            profiler.lap('flags')
+
+            # Draw the player
+            dirty.add(player.draw(screen))
+            profiler.lap('net')
+
+            # Draw level indicator
+            if rules.on_clear == 'level':
+                level_text = self.text_cache.render(self.font, f"Level: {state.level}", True, GREEN)
+                dirty.add(screen.blit(level_text, (WINDOW_WIDTH // 2 - 40, 10)))
+
+            dirty.add(self.draw_hud())
+
+            # Draw controls hint
+            if rules.pause and state.level == 1 and state.time < 5000:  # Show only at the beginning
+                hint_text = self.text_cache.render(self.font, "Arrow keys to move, P to pause", True,
+                                                   (150, 150, 150))
+                dirty.add(screen.blit(hint_text, (WINDOW_WIDTH // 2 - 150, PLAYING_AREA - 30)))
+        elif rules.restart:
+            self.draw_game_over()
+
+        profiler.lap('hud')
+
+        # Draw the profiler overlay when it is switched on
+        dirty.add(profiler.draw(screen))
+        profiler.lap('overlay')
+
+        # Update the display
+        dirty.present()
+        profiler.lap('flip')
+
+        # The level-up frame is drawn like any other; the background blend,
+        # which repaints the whole window, starts with the frame after it
+        if self.pending_level is not None:
+            background.start_transition(self.pending_level)
+            self.pending_level = None
+
+        # Get the next level ready on an ordinary frame rather than its first
+        if rules.on_clear == 'level' and self.preloaded_level != state.level + 1 and not background.transition:
+            self.preload_level(state.level + 1)
+
+
+def main(argv=None, preset=DEFAULT_PRESET, launch_time=None):
+    startup = StartupTimer(launch_time)
+
+    # Command line options
+    parser = argparse.ArgumentParser(description="Flag Catcher Game")
+    parser.add_argument("--preset", choices=PRESETS, default=preset,
+                        help="version of the game to play (default: %(default)s)")
+    parser.add_argument("--full-flip", action="store_true",
+                        help="repaint and flip the whole window every frame instead of dirty rectangles")
+    parser.add_argument("--stars", type=int, default=50,
+                        help="number of background stars (default: 50)")
+    parser.add_argument("--seed", type=parse_seed, default=None,
+                        help="seed for a reproducible game (default: random)")
+    parser.add_argument("--record", metavar="FILE",
+                        help="record the preset, seed and every tick's keys to a replay file")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="play back a replay file instead of reading the keyboard")
+    parser.add_argument("--profile-csv", metavar="FILE",
+                        help="write per-frame phase timings to a CSV file")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print how long each startup step took once the first frame is shown")
+    parser.add_argument("--quality", choices=['auto'] + [tier.name for tier in QUALITY_TIERS], default='auto',
+                        help="detail to draw; auto lowers it while frames run over budget (default: %(default)s)")
+    parser.add_argument("--frame-budget", type=float, default=FRAME_BUDGET_MS, metavar="MS",
+                        help="work time per frame that auto quality aims for (default: %(default).1f)")
+    args = parser.parse_args(argv)
+    startup.mark('imports')
+
+    seed = args.seed
+    rules = PRESETS[args.preset]
+    tick_ms = TICK_MS
+    replay = None
+    if args.replay:
+        # A replay brings its own preset, seed and tick rate
+        try:
+            replay = ReplayReader(args.replay)
+        except (OSError, ReplayError) as error:
+            parser.error(str(error))
+        rules = replay.rules
+        seed = replay.seed
+        tick_ms = replay.tick_ms
+        replay_keys = replay.ticks()
+
+    # Initialize only the pygame subsystems the game uses
+    init_pygame()
+    startup.mark('init')
+
+    # Set up the display
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption(rules.caption)
+    startup.mark('display')
+
+    # Pre-render flags, net and stars once the display format is known
+    atlas = SpriteAtlas()
+    startup.mark('sprites')
+
+    # Create the game state and presentation objects
+    profiler = FrameProfiler(LazyFont(20), MAX_RENDER_FPS, args.profile_csv)  # F3 toggles the overlay
+    quality = QualityController(args.frame_budget)
+    if args.quality != 'auto':
+        quality.lock(args.quality)
+    quality.add_listener(lambda tier, decision: print(
+        f"Quality {decision.old} -> {decision.new} (slow frames {decision.frame_ms:.1f} ms)", file=sys.stderr))
+    game = Game(screen, atlas, rules, seed, args.stars, profiler, quality)
+    state = game.state
+    print(f"Preset: {rules.name}  Seed: {state.seed}")
+    recorder = None
+    if args.record:
+        recorder = ReplayWriter(args.record, state.seed, round(1000 / tick_ms), rules.name)
+    startup.mark('game setup')
+
+    # Game loop
+    clock = pygame.time.Clock()
+    timestep = FixedTimestep(tick_ms)
+    frame_ms = 0
+    pause_pressed = False  # Held until a simulation tick consumes it
+    running = True
+    status = 0
+
+    while running:
+        frame_start = time.perf_counter()
+        profiler.begin_frame()
+
+        # Handle events
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                # Pause game with P key
+                if event.key == pygame.K_p:
+                    pause_pressed = True
+                # Toggle the profiler overlay with F3
+                elif event.key == pygame.K_F3:
+                    profiler.toggle()
+                    profiler.begin_frame()
+
+        # Run as many fixed simulation ticks as the elapsed time calls for. While
+        # paused, poll once per frame so the P key can resume the game.
+        if state.paused:
+            timestep.reset()
+            ticks = 1
+        else:
+            ticks = timestep.advance(frame_ms)
+
+        for _ in range(ticks):
+            if replay:
+                try:
+                    keys = next(replay_keys, None)
+                except ReplayError as error:
+                    # A damaged body ends playback early and fails the run
+                    print(error, file=sys.stderr)
+                    status = 1
+                    keys = None
+                if keys is None:
+                    running = False  # Replay finished
+                    break
+            else:
+                keys = read_keys(pause_pressed)
+                pause_pressed = False  # Deliver the key press to one tick only
+            if recorder:
+                recorder.record(keys)
+            game.handle(step(state, keys, tick_ms))
+
+        profiler.lap('update')
+
+        # Without a restart the game ends on a closing message
+        if state.game_over and not rules.restart:
+            game.draw_ending()
+            pygame.time.wait(ENDING_WAIT_MS)
+            break
+
+        # Skip updates if paused
+        if state.paused:
+            game.draw_paused()
+            frame_ms = clock.tick(10)  # Lower frame rate while paused
+            continue
+
+        game.draw(frame_ms, timestep.alpha, args.full_flip)
+
+        # Adjust the detail to how long updating and drawing took
+        quality.update((time.perf_counter() - frame_start) * 1000)
+        if startup is not None:
+            startup.mark('first frame')
+            if args.startup_report:
+                startup.report()
+            startup = None
+
+        # Cap the render rate and measure how much real time the frame took
+        frame_ms = clock.tick(MAX_RENDER_FPS)
+        profiler.end_frame(frame_ms, len(state.flags) - state.flags_captured, len(state.obstacles),
+                           len(game.particles), state.level, game.background.transition, quality.tier.name)
+
+    # Finish any recording or playback
+    if recorder:
+        recorder.close()
+    if replay:
+        replay.close()
+    profiler.close()
+
+    # Quit pygame
+    pygame.quit()
+    return status
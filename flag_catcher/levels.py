@@ -0,0 +1,113 @@
+# Level difficulty curve
+#
+# How many flags and obstacles a level spawns, how fast they move and how
+# often bonus flags appear all follow from a handful of knobs. Difficulty
+# holds the knobs and level_config() turns them into the settings for one
+# level, which create_flags() and create_obstacles() spawn from. The
+# defaults are the curve the game has always had.
+import math
+from collections import namedtuple
+
+from .constants import PLAYING_AREA
+
+Difficulty = namedtuple('Difficulty', [
+    'flags_per_level',           # Flags to capture to clear a level
+    'bonus_from_level',          # First level that can spawn bonus flags
+    'bonus_chance',              # Chance for each flag to be a bonus flag
+    'bonus_speed',               # Speed multiplier of bonus flags
+    'flag_speed',                # Speed multiplier of normal flags on level 1
+    'flag_speed_per_level',      # Added to it per level after the first
+    'obstacles_from_level',      # First level with obstacles
+    'obstacles_every',           # Levels between fresh obstacle layouts; others keep the last one
+    'obstacle_count_offset',     # A level has min(level - offset, max_obstacles) of them
+    'max_obstacles',
+    'obstacle_min_size',         # Smallest obstacle side in pixels
+    'obstacle_max_size',         # Largest obstacle side in pixels
+    'obstacle_speed',            # Obstacle top speed before the level bonus
+    'obstacle_speed_per_level',  # Added to it per level
+])
+
+DEFAULT_DIFFICULTY = Difficulty(
+    flags_per_level=6,
+    bonus_from_level=2,
+    bonus_chance=0.2,
+    bonus_speed=1.5,
+    flag_speed=1.0,
+    flag_speed_per_level=0.2,
+    obstacles_from_level=2,
+    obstacles_every=1,
+    obstacle_count_offset=0,
+    max_obstacles=5,
+    obstacle_min_size=30,
+    obstacle_max_size=60,
+    obstacle_speed=0.5,
+    obstacle_speed_per_level=0.2,
+)
+
+# Least value of the knobs that have one; the rest may be any finite number
+KNOB_MINIMUMS = {
+    'flags_per_level': 1,
+    'bonus_from_level': 1,
+    'bonus_chance': 0,
+    'bonus_speed': 0,
+    'flag_speed': 0,
+    'obstacles_from_level': 1,
+    'obstacles_every': 1,
+    'max_obstacles': 0,
+    'obstacle_min_size': 1,
+}
+
+# Largest obstacle side that still fits the playing area inside the 50 px
+# margin obstacles spawn within
+MAX_OBSTACLE_SIZE = PLAYING_AREA - 100
+
+
+# Raise ValueError naming the first knob a game could not be played with,
+# so tools taking difficulties from users can refuse them up front
+def check_difficulty(difficulty):
+    for name, value in difficulty._asdict().items():
+        if not math.isfinite(value):
+            raise ValueError(f"{name} must be a finite number, not {value}")
+        least = KNOB_MINIMUMS.get(name)
+        if least is not None and value < least:
+            raise ValueError(f"{name} must be at least {least}, not {value}")
+    d = difficulty
+    if d.bonus_chance > 1:
+        raise ValueError(f"bonus_chance must be at most 1, not {d.bonus_chance}")
+    if d.obstacle_max_size < d.obstacle_min_size:
+        raise ValueError(f"obstacle_max_size ({d.obstacle_max_size}) must be at least "
+                         f"obstacle_min_size ({d.obstacle_min_size})")
+    if d.obstacle_max_size > MAX_OBSTACLE_SIZE:
+        raise ValueError(f"obstacle_max_size must be at most {MAX_OBSTACLE_SIZE}, not {d.obstacle_max_size}")
+
+
+# Settings for a single level
+LevelConfig = namedtuple('LevelConfig', [
+    'level', 'flags', 'bonus_chance', 'bonus_speed', 'flag_speed',
+    'obstacles', 'new_obstacles', 'obstacle_min_size', 'obstacle_max_size', 'obstacle_speed',
+])
+
+
+def level_config(level, difficulty=DEFAULT_DIFFICULTY):
+    d = difficulty
+    bonus_chance = d.bonus_chance if level >= d.bonus_from_level else 0.0
+    obstacles = min(level - d.obstacle_count_offset, d.max_obstacles) if level >= d.obstacles_from_level else 0
+    # Levels before the first obstacles start out empty, so they count as fresh layouts too
+    new_obstacles = level < d.obstacles_from_level or (level - d.obstacles_from_level) % d.obstacles_every == 0
+    return LevelConfig(
+        level=level,
+        flags=d.flags_per_level,
+        bonus_chance=bonus_chance,
+        bonus_speed=d.bonus_speed,
+        flag_speed=d.flag_speed + (level - 1) * d.flag_speed_per_level,
+        obstacles=max(0, obstacles),
+        new_obstacles=new_obstacles,
+        obstacle_min_size=d.obstacle_min_size,
+        obstacle_max_size=d.obstacle_max_size,
+        obstacle_speed=d.obstacle_speed + level * d.obstacle_speed_per_level,
+    )
+
+
+# The first `levels` rows of the table, e.g. for printing a curve
+def level_table(levels=10, difficulty=DEFAULT_DIFFICULTY):
+    return [level_config(level, difficulty) for level in range(1, levels + 1)]
@@ -0,0 +1,127 @@
+# Rules presets for every version of the game
+#
+# The repository grew one standalone script per version of the game, each
+# re-declaring the flags, the spawning and the reset logic with small
+# differences. They all run on this package now: a Rules preset records what
+# set one version apart, sim.step() plays by it and the game loop draws it,
+# so a fix or an optimization lands once and every version gets it. Each
+# preset is named after the script it replaces and builds on the version
+# before it.
+from collections import namedtuple
+
+from .levels import DEFAULT_DIFFICULTY
+
+Rules = namedtuple('Rules', [
+    'name',
+    'caption',           # Window title
+    'difficulty',        # Level curve, see levels.Difficulty
+    'player_radius',     # Capture radius and distance kept from the walls
+    'net',               # Butterfly net instead of a red circle
+    'moving_flags',      # Flags drift and bounce off the walls
+    'flag_bounce',       # Moving flags also bounce off obstacles and each other
+    'flag_wave',         # Flags wave and bonus flags are marked
+    'flag_spacing',      # Minimum distance between new flags, at least sim.MIN_FLAG_SPACING
+    'player_clearance',  # Minimum distance between new flags and the player, at least the capture reach
+    'game_duration',     # Round length in milliseconds, or None for no time limit
+    'on_clear',          # Capturing every flag 'end's the game, 'respawn's them or goes to the next 'level'
+    'restart',           # R starts a new game after game over; otherwise the window closes
+    'pause',             # P pauses the game
+    'effects',           # Particle bursts on capture
+    'background',        # 'black', twinkling 'stars' or 'parallax' stars over level colours
+    'hud',               # 'corner' text under the playing area or a centred 'strip' below a separator
+    'flags_counter',     # The HUD shows the flags left
+])
+
+# Six static flags to collect, no levels and nothing in the way
+CLASSIC_DIFFICULTY = DEFAULT_DIFFICULTY._replace(
+    bonus_chance=0.0,
+    flag_speed_per_level=0.0,
+    max_obstacles=0,
+)
+
+IMPORT_PYGAME = Rules(
+    name='import-pygame',
+    caption="Circle Movement Game",
+    difficulty=CLASSIC_DIFFICULTY,
+    player_radius=20,
+    net=False,
+    moving_flags=False,
+    flag_bounce=False,
+    flag_wave=False,
+    flag_spacing=0,
+    player_clearance=0,
+    game_duration=None,
+    on_clear='end',
+    restart=False,
+    pause=False,
+    effects=False,
+    background='black',
+    hud='corner',
+    flags_counter=False,
+)
+
+MODIFY_GAME = IMPORT_PYGAME._replace(name='modify-game')
+
+CIRCLE_GAME = IMPORT_PYGAME._replace(
+    name='circle-game',
+    flag_spacing=60,
+    player_clearance=100,
+    flags_counter=True,
+)
+
+MODIFY_GAME1 = IMPORT_PYGAME._replace(name='modify-game1', game_duration=60000)
+
+MODIFY_GAME2 = MODIFY_GAME1._replace(name='modify-game2', on_clear='respawn')
+
+MODIFY_GAME3 = MODIFY_GAME2._replace(name='modify-game3', restart=True)
+
+MODIFY_GAME4 = MODIFY_GAME3._replace(name='modify-game4', moving_flags=True)
+
+MODIFY_GAME5 = MODIFY_GAME4._replace(name='modify-game5', hud='strip', flags_counter=True)
+
+MODIFY_GAME6 = MODIFY_GAME5._replace(
+    name='modify-game6',
+    caption="Flag Catcher Game",
+    player_radius=25,
+    net=True,
+)
+
+# Levels, bonus flags and power-ups; static obstacles from level 3, with a
+# new layout every other level
+MODIFICATION_BY_ME = MODIFY_GAME6._replace(
+    name='modification-by-me',
+    difficulty=DEFAULT_DIFFICULTY._replace(
+        obstacles_from_level=3,
+        obstacles_every=2,
+        obstacle_count_offset=2,
+        max_obstacles=3,
+        obstacle_max_size=80,
+        obstacle_speed=0.0,
+        obstacle_speed_per_level=0.0,
+    ),
+    flag_wave=True,
+    on_clear='level',
+    pause=True,
+    effects=True,
+    background='stars',
+)
+
+NEW_MODIFCATION = MODIFICATION_BY_ME._replace(name='new-modifcation', background='parallax')
+
+# Moving obstacles on every level from level 2
+NEXT_LEVEL_MODIFICATION = NEW_MODIFCATION._replace(
+    name='next-level-modification',
+    difficulty=DEFAULT_DIFFICULTY,
+)
+
+# Not a script of its own: the latest version with flags that bounce off
+# the obstacles and off each other instead of drifting through them
+BOUNCING_FLAGS = NEXT_LEVEL_MODIFICATION._replace(name='bouncing-flags', flag_bounce=True)
+
+PRESETS = {rules.name: rules for rules in (
+    IMPORT_PYGAME, MODIFY_GAME, CIRCLE_GAME, MODIFY_GAME1, MODIFY_GAME2, MODIFY_GAME3, MODIFY_GAME4,
+    MODIFY_GAME5, MODIFY_GAME6, MODIFICATION_BY_ME, NEW_MODIFCATION, NEXT_LEVEL_MODIFICATION, BOUNCING_FLAGS,
+)}
+
+DEFAULT_PRESET = NEXT_LEVEL_MODIFICATION.name
+DEFAULT_RULES = NEXT_LEVEL_MODIFICATION
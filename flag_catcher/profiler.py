@@ -0,0 +1,137 @@
+# Frame profiler with an in-game overlay and CSV dump
+#
+# The game loop calls lap(phase) after each part of a frame and end_frame()
+# once it is presented. While neither the overlay nor a CSV dump is active
+# those methods are bound to a no-op, so a disabled profiler costs one empty
+# call per phase and nothing else.
+import csv
+import time
+from collections import deque
+
+import pygame
+
+# Frame phases in the order the game loop runs them
+PHASES = ('update', 'background', 'obstacles', 'effects', 'flags', 'net', 'hud', 'overlay', 'flip')
+
+# Frames averaged for the overlay, and how often its text is re-rendered
+HISTORY = 120
+OVERLAY_REFRESH_MS = 250
+
+OVERLAY_POS = (8, 30)
+OVERLAY_BACKGROUND = (0, 0, 0, 170)
+OVERLAY_COLOR = (200, 255, 200)
+
+
+def _noop(*args, **kwargs):
+    pass
+
+
+class FrameProfiler:
+    def __init__(self, font, target_fps, csv_path=None):
+        self.font = font
+        self.target_fps = target_fps
+        self.visible = False
+        self.history = deque(maxlen=HISTORY)
+        self.times = {}
+        self.last = 0
+        self.frame = 0
+        self.panel = None
+        self.panel_time = 0
+
+        self.csv_file = None
+        self.csv_writer = None
+        if csv_path:
+            self.csv_file = open(csv_path, 'w', newline='')
+            self.csv_writer = csv.writer(self.csv_file)
+            self.csv_writer.writerow(('frame', 'frame_ms') + tuple(f'{phase}_ms' for phase in PHASES)
+                                     + ('flags', 'obstacles', 'particles', 'level', 'transition', 'quality'))
+        self._bind()
+
+    @property
+    def active(self):
+        return self.visible or self.csv_writer is not None
+
+    def _bind(self):
+        # Swap the hot methods for no-ops while nothing consumes the timings
+        if self.active:
+            self.begin_frame = self._begin_frame
+            self.lap = self._lap
+            self.end_frame = self._end_frame
+            self.draw = self._draw
+        else:
+            self.begin_frame = self.lap = self.end_frame = _noop
+            self.draw = lambda screen: []
+
+    def toggle(self):
+        self.visible = not self.visible
+        self.history.clear()
+        self.panel = None
+        self._bind()
+
+    def _begin_frame(self):
+        self.times = dict.fromkeys(PHASES, 0.0)
+        self.last = time.perf_counter()
+
+    def _lap(self, phase):
+        # Charge the time since the previous lap to phase
+        now = time.perf_counter()
+        self.times[phase] += (now - self.last) * 1000
+        self.last = now
+
+    def _end_frame(self, frame_ms, flags, obstacles, particles, level, transition, quality=''):
+        self.frame += 1
+        self.history.append((frame_ms, self.times, flags, obstacles, particles, quality))
+        if self.csv_writer is not None:
+            self.csv_writer.writerow((self.frame, round(frame_ms, 3))
+                                     + tuple(round(self.times[phase], 3) for phase in PHASES)
+                                     + (flags, obstacles, particles, level, int(transition), quality))
+
+    def _draw(self, screen):
+        # Returns the rectangles drawn, for dirty-rect presentation
+        if not self.visible or not self.history:
+            return []
+        now = pygame.time.get_ticks()
+        if self.panel is None or now - self.panel_time >= OVERLAY_REFRESH_MS:
+            self.panel = self._render_panel()
+            self.panel_time = now
+        return [screen.blit(self.panel, OVERLAY_POS)]
+
+    def _render_panel(self):
+        count = len(self.history)
+        frame_ms = sum(entry[0] for entry in self.history) / count
+        worst_ms = max(entry[0] for entry in self.history)
+        averages = {phase: sum(entry[1][phase] for entry in self.history) / count for phase in PHASES}
+        _, _, flags, obstacles, particles, quality = self.history[-1]
+        update = averages['update']
+        flip = averages['flip']
+        draw = sum(averages.values()) - update - flip
+        fps = 1000 / frame_ms if frame_ms else 0
+
+        lines = [
+            f"FPS {fps:5.1f} / {self.target_fps} target",
+            f"frame {frame_ms:5.2f} ms  worst {worst_ms:5.2f} ms",
+            f"update {update:5.2f}  draw {draw:5.2f}  flip {flip:5.2f} ms",
+        ]
+        lines += [f"  {phase:<10} {averages[phase]:6.3f} ms" for phase in PHASES
+                  if phase not in ('update', 'flip')]
+        lines.append(f"flags {flags}  obstacles {obstacles}  particles {particles}")
+        if quality:
+            lines.append(f"quality {quality}")
+
+        rendered = [self.font.render(line, True, OVERLAY_COLOR) for line in lines]
+        width = max(surface.get_width() for surface in rendered) + 12
+        height = sum(surface.get_height() for surface in rendered) + 12
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill(OVERLAY_BACKGROUND)
+        y = 6
+        for surface in rendered:
+            panel.blit(surface, (6, y))
+            y += surface.get_height()
+        return panel
+
+    def close(self):
+        if self.csv_file is not None:
+            self.csv_file.close()
+            self.csv_file = None
+            self.csv_writer = None
+            self._bind()
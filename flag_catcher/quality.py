@@ -0,0 +1,123 @@
+# Adaptive render quality
+#
+# A QualityTier says how much cosmetic detail a frame draws: how many of the
+# starfield's parallax bands are shown and whether its stars twinkle, how
+# many particles a capture bursts into, how fine the butterfly net's mesh is
+# and whether flags wave. None of it touches the simulation, so a game plays
+# the same at every tier.
+#
+# QualityController watches how long each frame's work took (the time spent
+# updating and drawing, not the time spent waiting for the next frame) and
+# steps down a tier when the slow end of recent frames no longer fits the
+# frame budget, and back up after frames have had clear headroom for a
+# while. Each change is recorded as a Decision and reported to listeners, so
+# the game (or anything else) can apply it and the choice can be inspected.
+from collections import deque, namedtuple
+
+QualityTier = namedtuple('QualityTier', [
+    'name',
+    'star_bands',  # Parallax star bands drawn, slowest first
+    'twinkle',     # Stars twinkle
+    'particles',   # Particles per capture burst
+    'net_spokes',  # Spokes in the butterfly net's mesh
+    'flag_wave',   # Flags wave; otherwise they hang still
+])
+
+# Best first
+QUALITY_TIERS = (
+    QualityTier('high', star_bands=4, twinkle=True, particles=10, net_spokes=12, flag_wave=True),
+    QualityTier('medium', star_bands=3, twinkle=True, particles=6, net_spokes=8, flag_wave=True),
+    QualityTier('low', star_bands=2, twinkle=False, particles=3, net_spokes=6, flag_wave=False),
+    QualityTier('minimal', star_bands=0, twinkle=False, particles=0, net_spokes=4, flag_wave=False),
+)
+
+# Work time one frame may take for a steady 60 FPS
+FRAME_BUDGET_MS = 1000 / 60
+
+# Frames looked at per decision; decisions follow the 90th percentile, since
+# a frame over budget is a dropped frame however fast the others were
+WINDOW = 30
+PERCENTILE = 0.9
+
+# Recent frames must stay under this share of the budget for UPGRADE_FRAMES
+# frames in a row before detail comes back, so the controller does not flip
+# back and forth around the budget
+HEADROOM = 0.6
+UPGRADE_FRAMES = 240
+
+# One tier change: the frame it happened on, the tier names before and
+# after, and the frame time that prompted it
+Decision = namedtuple('Decision', ['frame', 'old', 'new', 'frame_ms'])
+
+
+class QualityController:
+    def __init__(self, budget_ms=FRAME_BUDGET_MS, tiers=QUALITY_TIERS, start=0, window=WINDOW):
+        self.budget_ms = budget_ms
+        self.tiers = tiers
+        self.index = start
+        self.locked = False
+        self.samples = deque(maxlen=window)
+        self.frame = 0
+        self.calm = 0  # Frames in a row with headroom
+        self.decisions = []
+        self.listeners = []
+
+    @property
+    def tier(self):
+        return self.tiers[self.index]
+
+    def add_listener(self, listener):
+        # listener(tier, decision) is called on every change
+        self.listeners.append(listener)
+
+    def find(self, name):
+        for index, tier in enumerate(self.tiers):
+            if tier.name == name:
+                return index
+        raise ValueError(f"no quality tier named {name!r}")
+
+    def lock(self, name):
+        # Hold a tier regardless of frame times
+        self.locked = True
+        self._switch(self.find(name), None)
+
+    def unlock(self):
+        self.locked = False
+        self.samples.clear()
+        self.calm = 0
+
+    def update(self, work_ms):
+        # Feed one frame's work time; returns the Decision if the tier changed
+        self.frame += 1
+        if self.locked:
+            return None
+        samples = self.samples
+        samples.append(work_ms)
+        if len(samples) < samples.maxlen:
+            return None
+
+        slow = sorted(samples)[int((len(samples) - 1) * PERCENTILE)]
+        if slow > self.budget_ms:
+            self.calm = 0
+            if self.index < len(self.tiers) - 1:
+                return self._switch(self.index + 1, slow)
+        elif slow < self.budget_ms * HEADROOM:
+            self.calm += 1
+            if self.calm >= UPGRADE_FRAMES and self.index > 0:
+                return self._switch(self.index - 1, slow)
+        else:
+            self.calm = 0
+        return None
+
+    def _switch(self, index, frame_ms):
+        old = self.tier
+        self.index = index
+        self.samples.clear()
+        self.calm = 0
+        if self.tier is old:
+            return None
+        decision = Decision(self.frame, old.name, self.tier.name, frame_ms)
+        self.decisions.append(decision)
+        for listener in self.listeners:
+            listener(self.tier, decision)
+        return decision
@@ -0,0 +1,204 @@
+# Input recording and replay
+#
+# A replay is the rules preset and seed plus the key bits fed to every
+# simulation tick, which is all step() needs to reproduce a game exactly.
+# The file is a short header followed by run-length encoded key states:
+#
+#   header: b'FCRP', version (u8), engine version (u8), tick rate (u16),
+#           seed (u64)
+#   preset: name length (u8), UTF-8 name
+#   body:   repeated (keys: u8, run length: LEB128 varint)
+#
+# Runs are written as soon as the keys change and read back one at a time,
+# so neither side ever holds the whole recording in memory. The same keys
+# only replay the same game under the rules they were recorded with, so a
+# file whose engine version is not sim.ENGINE_VERSION is refused, as are
+# files from before the header carried one.
+#
+# Usage: python -m flag_catcher.replay FILE  (fast-forwards without rendering)
+import argparse
+import struct
+import sys
+import time
+
+from .presets import DEFAULT_PRESET, PRESETS
+from .sim import ENGINE_VERSION, GameState, step, TICK_RATE
+
+MAGIC = b'FCRP'
+VERSION = 3
+HEADER = struct.Struct('<4sBBHQ')
+
+# Seeds are stored as u64, so recordable games have seeds in this range
+MAX_SEED = 2 ** 64 - 1
+
+
+class ReplayError(Exception):
+    pass
+
+
+# argparse type for --seed values a replay can record
+def parse_seed(text):
+    seed = int(text)
+    if not 0 <= seed <= MAX_SEED:
+        raise argparse.ArgumentTypeError(f"seed must be between 0 and {MAX_SEED}")
+    return seed
+
+
+def _write_varint(stream, value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return stream.write(out)
+
+
+class ReplayWriter:
+    def __init__(self, path, seed, tick_rate=TICK_RATE, preset=DEFAULT_PRESET):
+        # Build the header first, so a seed or name that does not fit leaves
+        # no empty file behind
+        if not 0 <= seed <= MAX_SEED:
+            raise ReplayError(f"seed {seed} does not fit in a replay")
+        name = preset.encode()
+        header = HEADER.pack(MAGIC, VERSION, ENGINE_VERSION, tick_rate, seed) + bytes((len(name),)) + name
+        self.stream = open(path, 'wb')
+        self.stream.write(header)
+        self.keys = None
+        self.run = 0
+
+    def record(self, keys):
+        # Log the key bits for one tick
+        if keys == self.keys:
+            self.run += 1
+            return
+        self._flush()
+        self.keys = keys
+        self.run = 1
+
+    def _flush(self):
+        if self.run:
+            self.stream.write(bytes((self.keys,)))
+            _write_varint(self.stream, self.run)
+
+    def close(self):
+        self._flush()
+        self.run = 0
+        self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ReplayReader:
+    def __init__(self, path):
+        self.path = path
+        self.stream = open(path, 'rb')
+        try:
+            self._read_header()
+        except BaseException:
+            # The caller never gets a reader to close, so do it here
+            self.stream.close()
+            raise
+
+    def _read_header(self):
+        path = self.path
+        header = self.stream.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ReplayError(f"{path}: truncated header")
+        magic, version, engine, self.tick_rate, self.seed = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ReplayError(f"{path}: not a replay file")
+        if version != VERSION:
+            raise ReplayError(f"{path}: unsupported replay version {version}")
+        if engine != ENGINE_VERSION:
+            raise ReplayError(f"{path}: recorded with engine version {engine}, this is {ENGINE_VERSION}")
+        length = self.stream.read(1)
+        name = self.stream.read(length[0]) if length else b''
+        if not length or len(name) < length[0]:
+            raise ReplayError(f"{path}: truncated header")
+        self.preset = name.decode()
+        if self.preset not in PRESETS:
+            raise ReplayError(f"{path}: unknown preset {self.preset!r}")
+
+    @property
+    def rules(self):
+        return PRESETS[self.preset]
+
+    @property
+    def tick_ms(self):
+        return 1000 / self.tick_rate
+
+    def runs(self):
+        # Yield (keys, run length) pairs as they are read from disk
+        read = self.stream.read
+        while True:
+            keys = read(1)
+            if not keys:
+                return
+            run = 0
+            shift = 0
+            while True:
+                byte = read(1)
+                if not byte:
+                    raise ReplayError(f"{self.path}: replay ends in the middle of a run")
+                run |= (byte[0] & 0x7F) << shift
+                shift += 7
+                if byte[0] < 0x80:
+                    break
+            yield keys[0], run
+
+    def ticks(self):
+        # Yield the key bits for each tick in order
+        for keys, run in self.runs():
+            for _ in range(run):
+                yield keys
+
+    def close(self):
+        self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Run a whole replay without rendering; returns the final game state and
+# the number of ticks replayed
+def simulate(path):
+    ticks = 0
+    with ReplayReader(path) as reader:
+        state = GameState(reader.seed, reader.rules)
+        dt = reader.tick_ms
+        for keys in reader.ticks():
+            step(state, keys, dt)
+            ticks += 1
+    return state, ticks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fast-forward a Flag Catcher replay without rendering")
+    parser.add_argument("replay", help="replay file recorded with --record")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        state, ticks = simulate(args.replay)
+    except (OSError, ReplayError) as error:
+        parser.error(str(error))
+    elapsed = time.perf_counter() - start
+    print(f"Preset: {state.rules.name}  Seed: {state.seed}")
+    print(f"Score: {state.score}  High score: {state.high_score}  Level: {state.level}")
+    print(f"Game over: {state.game_over}  Ticks: {ticks}")
+    print(f"Simulated in {elapsed:.3f}s ({ticks / max(elapsed, 1e-9):.0f} ticks/s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
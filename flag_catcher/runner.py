@@ -0,0 +1,174 @@
+# Parallel headless game runner
+#
+# Plays whole seeded games with a scripted bot across a process pool and
+# streams each game's result back as soon as it finishes, so thousands of
+# games can be run and summarised without opening a window. Every game is
+# fully determined by its seed and the bot, so a run is reproducible no
+# matter how the games are spread over the workers.
+#
+# Usage: python -m flag_catcher.runner [--games N] [--seed N] [--workers N] [--preset NAME] [--output FILE]
+import argparse
+import functools
+import json
+import multiprocessing
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from .presets import DEFAULT_PRESET, DEFAULT_RULES, PRESETS
+from .sim import GameState, step, KEY_LEFT, KEY_RIGHT, KEY_UP, KEY_DOWN, TICK_MS
+
+# Pixels within which the bot stops steering towards a flag along an axis
+BOT_DEADZONE = 3
+
+# Ticks before a stuck bot switches which way it slides
+BOT_SIDESTEP_TICKS = 60
+
+
+# Steer towards the nearest free flag, sidestepping when an obstacle blocks
+# the way. Returns the key bits for the next tick.
+def nearest_flag_bot(state):
+    flags = state.flags
+    free = np.flatnonzero(~flags.captured)
+    if not len(free):
+        return 0
+    dx = flags.x[free] - state.player_x
+    dy = flags.y[free] - state.player_y
+    target = int(np.argmin(dx * dx + dy * dy))
+    dx = dx[target]
+    dy = dy[target]
+
+    keys = 0
+    if dx < -BOT_DEADZONE:
+        keys |= KEY_LEFT
+    elif dx > BOT_DEADZONE:
+        keys |= KEY_RIGHT
+    if dy < -BOT_DEADZONE:
+        keys |= KEY_UP
+    elif dy > BOT_DEADZONE:
+        keys |= KEY_DOWN
+
+    # A blocked move leaves the player where it was; slide around the
+    # obstacle along one axis, switching sides every few ticks
+    stuck = state.player_x == state.prev_player_x and state.player_y == state.prev_player_y
+    if keys and stuck and state.tick:
+        phase = (state.tick // BOT_SIDESTEP_TICKS) % 2
+        horizontal = keys & (KEY_LEFT | KEY_RIGHT)
+        vertical = keys & (KEY_UP | KEY_DOWN)
+        if horizontal and vertical:
+            keys = horizontal if phase else vertical
+        elif horizontal:
+            keys = KEY_UP if phase else KEY_DOWN
+        else:
+            keys = KEY_LEFT if phase else KEY_RIGHT
+    return keys
+
+
+# Play one game to the end; returns its result as a dict. clear_times
+# holds the seconds each cleared level took.
+def play(seed, bot=nearest_flag_bot, dt=TICK_MS, rules=DEFAULT_RULES):
+    start = time.perf_counter()
+    state = GameState(seed, rules)
+    captures = 0
+    power_ups = 0
+    clear_times = []
+    level_start = 0
+    while not state.game_over:
+        for event in step(state, bot(state), dt):
+            if event[0] == 'capture':
+                captures += 1
+            elif event[0] == 'power_up':
+                power_ups += 1
+            elif event[0] == 'level_up':
+                clear_times.append(round((state.time - level_start) / 1000, 3))
+                level_start = state.time
+    return {
+        'seed': seed,
+        'score': state.score,
+        'level': state.level,
+        'captures': captures,
+        'captures_per_second': round(captures / (state.time / 1000), 4),
+        'power_ups': power_ups,
+        'clear_times': clear_times,
+        'ticks': state.tick,
+        'elapsed': round(time.perf_counter() - start, 4),
+    }
+
+
+# Play every seed across a pool of worker processes, yielding results in
+# the order games finish
+def run_games(seeds, workers=None, chunksize=4, rules=DEFAULT_RULES):
+    with multiprocessing.Pool(workers) as pool:
+        yield from pool.imap_unordered(functools.partial(play, rules=rules), seeds, chunksize)
+
+
+# Summary statistics over a collection of game results
+def aggregate(results):
+    results = list(results)
+    if not results:
+        return {'games': 0}
+    scores = [result['score'] for result in results]
+    levels = [result['level'] for result in results]
+    histogram = {}
+    for level in sorted(levels):
+        histogram[level] = histogram.get(level, 0) + 1
+
+    # Time to clear each level, over the games that cleared it
+    by_level = {}
+    for result in results:
+        for level, seconds in enumerate(result['clear_times'], 1):
+            by_level.setdefault(level, []).append(seconds)
+    clear_times = [seconds for times in by_level.values() for seconds in times]
+    return {
+        'games': len(results),
+        'score_mean': round(statistics.fmean(scores), 2),
+        'score_median': statistics.median(scores),
+        'score_stdev': round(statistics.pstdev(scores), 2),
+        'score_min': min(scores),
+        'score_max': max(scores),
+        'level_mean': round(statistics.fmean(levels), 3),
+        'level_histogram': histogram,
+        'captures_per_second_mean': round(statistics.fmean(r['captures_per_second'] for r in results), 4),
+        'power_ups_mean': round(statistics.fmean(r['power_ups'] for r in results), 3),
+        'clear_time_mean': round(statistics.fmean(clear_times), 3) if clear_times else None,
+        'clear_time_by_level': {level: round(statistics.fmean(times), 3) for level, times in by_level.items()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play seeded headless games with a scripted bot in parallel")
+    parser.add_argument("--games", type=int, default=1000, help="games to play (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game; the rest count up from it")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--preset", choices=PRESETS, default=DEFAULT_PRESET,
+                        help="rules to play by (default: %(default)s)")
+    parser.add_argument("--output", metavar="FILE", help="stream one JSON line per game to this file")
+    args = parser.parse_args(argv)
+
+    seeds = range(args.seed, args.seed + args.games)
+    output = open(args.output, 'w') if args.output else None
+    results = []
+    start = time.perf_counter()
+    try:
+        for result in run_games(seeds, args.workers, rules=PRESETS[args.preset]):
+            results.append(result)
+            if output:
+                output.write(json.dumps(result) + '\n')
+            if len(results) % 100 == 0 or len(results) == args.games:
+                rate = len(results) / (time.perf_counter() - start)
+                print(f"{len(results)}/{args.games} games ({rate:.1f} games/s)", file=sys.stderr)
+    finally:
+        if output:
+            output.close()
+
+    summary = aggregate(results)
+    summary['elapsed'] = round(time.perf_counter() - start, 3)
+    json.dump(summary, sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,536 @@
+# Headless Flag Catcher simulation
+#
+# Everything the game loop used to do between reading the keyboard and
+# drawing lives here: player movement, flag and obstacle movement, captures,
+# power-ups, level-up and the round timer, played by the rules of one of the
+# presets. Nothing in this module touches pygame, so rounds can be simulated
+# as fast as the CPU allows.
+import random
+
+import numpy as np
+
+from .constants import WINDOW_WIDTH, PLAYING_AREA, FLAG_COLORS
+from .levels import DEFAULT_DIFFICULTY, level_config
+from .presets import DEFAULT_RULES
+from .spawn import Spawner, box_distance
+from .store import FlagStore, ObstacleStore
+
+# Version of the rules step() plays by. Bump it whenever a seed and a
+# sequence of keys play out differently, so recorded replays and cached
+# sweep results from before are refused instead of silently disagreeing.
+ENGINE_VERSION = 6
+
+# Input bits, one per key the game loop reads
+KEY_LEFT = 1
+KEY_RIGHT = 2
+KEY_UP = 4
+KEY_DOWN = 8
+KEY_PAUSE = 16
+KEY_RESET = 32
+
+# One frame of the original 60 FPS loop; all speeds are per frame
+FRAME_MS = 1000 / 60
+
+# Default simulation rate, independent of how often the game is drawn
+TICK_RATE = 120
+TICK_MS = 1000 / TICK_RATE
+
+# Game rules
+GAME_DURATION = DEFAULT_RULES.game_duration  # 60 seconds in milliseconds
+POWER_UP_DURATION = 5000  # 5 seconds
+PLAYER_SPEED = 5
+BOOST_SPEED = 8
+PLAYER_RADIUS = DEFAULT_RULES.player_radius  # Capture radius
+FLAG_RADIUS = 10  # Approximate flag hitbox radius
+FLAGS_PER_LEVEL = DEFAULT_DIFFICULTY.flags_per_level
+
+# Room left between new obstacles, and between them and the player, for
+# the player to pass
+OBSTACLE_SPACING = 2 * PLAYER_RADIUS
+
+# Extra room a prepared next level keeps around the player while it waits,
+# so the player can wander half of it before the level is fitted again
+# (see NextLevel) and the level-up tick rarely has anything left to move
+FIT_MARGIN = 40
+
+# Least room a game keeps between new flags, whatever its rules ask for, so
+# they never spawn overlapping. New flags also always spawn outside the
+# player's capture reach.
+MIN_FLAG_SPACING = 2 * FLAG_RADIUS
+
+# Levels with at least this many flags or obstacles, the "swarm" levels of
+# custom difficulties, track them in a spatial hash (see spatial.py) that
+# answers the player's capture and collision checks
+GRID_MIN_FLAGS = 300
+GRID_MIN_OBSTACLES = 40
+
+
+# Lays out a level's flags one at a time, so the work can be spread over
+# ticks (see NextLevel). New flags stay spacing apart from each other, and
+# clear of whatever block() was given. If the playing area fills up first,
+# fewer flags are made (see spawn.py): count drops to the flags actually
+# placed, and dropped says how many of those asked for found no room.
+class FlagLayout:
+    __slots__ = ('config', 'count', 'dropped', 'rng', 'spacing', 'spawner', 'x', 'y', 'speed_x', 'speed_y',
+                 'points', 'color_index', 'wave_speed')
+
+    def __init__(self, level, count=None, rng=random, difficulty=DEFAULT_DIFFICULTY, spacing=0):
+        self.config = level_config(level, difficulty)
+        self.count = self.config.flags if count is None else count
+        self.dropped = 0
+        self.rng = rng
+        self.spacing = spacing
+        self.spawner = Spawner(rng)
+        self.x, self.y, self.speed_x, self.speed_y = [], [], [], []
+        self.points, self.color_index, self.wave_speed = [], [], []
+
+    def block(self, player=None, clearance=0, obstacles=None):
+        # Keep new flags clearance away from the player and clear of obstacles
+        spawner = self.spawner
+        if player is not None:
+            spawner.block(player[0], player[1], gap=clearance)
+        if obstacles is not None:
+            for box in zip(obstacles.x.tolist(), obstacles.y.tolist(), obstacles.width.tolist(),
+                           obstacles.height.tolist()):
+                spawner.block(*box, gap=FLAG_RADIUS)
+
+    def add(self):
+        # Place one more flag; False once there are count or no room is left
+        i = len(self.x)
+        if i >= self.count:
+            return False
+        spot = self.spawner.place(0, 0, 30, 30, WINDOW_WIDTH - 30, PLAYING_AREA - 30, spacing=self.spacing)
+        if spot is None:
+            self.dropped += self.count - i
+            self.count = i
+            return False
+        self.x.append(spot[0])
+        self.y.append(spot[1])
+
+        # Add chance for bonus flags in higher levels
+        config = self.config
+        rng = self.rng
+        if config.bonus_chance and rng.random() < config.bonus_chance:
+            self.points.append(100)
+            speed_mult = config.bonus_speed
+        else:
+            self.points.append(50)
+            speed_mult = config.flag_speed  # Increases with level
+
+        self.speed_x.append(rng.uniform(-1.5, 1.5) * speed_mult)
+        self.speed_y.append(rng.uniform(-1.5, 1.5) * speed_mult)
+        self.color_index.append(i % len(FLAG_COLORS))
+        self.wave_speed.append(rng.uniform(0.05, 0.1))
+        return True
+
+    def fit(self, player, clearance, obstacles, flags=None, placed_around=False):
+        # The finished flags, with any that the player or obstacles moved
+        # onto since they were placed put somewhere clear again. flags is
+        # the store already built from the layout, kept as it is when
+        # nothing crowds it; placed_around says the obstacles are the very
+        # ones the flags were laid out around, which cannot crowd them.
+        if flags is None:
+            flags = self.store()
+        crowded = np.hypot(flags.x - player[0], flags.y - player[1]) < clearance
+        if len(obstacles) and not placed_around:
+            crowded |= np.any(box_distance(flags.x[:, None], flags.y[:, None], 0, 0, obstacles.x, obstacles.y,
+                                           obstacles.width, obstacles.height) < FLAG_RADIUS, axis=1)
+        if not crowded.any():
+            return flags
+        self._replace(np.flatnonzero(crowded).tolist(), player, clearance, obstacles)
+        return self.store()
+
+    def _replace(self, moved, player, clearance, obstacles):
+        self.spawner = Spawner(self.rng)
+        self.block(player, clearance, obstacles)
+        for i in range(len(self.x)):
+            if i not in moved:
+                self.spawner.block(self.x[i], self.y[i])
+        for i in reversed(moved):
+            spot = self.spawner.place(0, 0, 30, 30, WINDOW_WIDTH - 30, PLAYING_AREA - 30, spacing=self.spacing)
+            if spot is None:
+                for column in (self.x, self.y, self.speed_x, self.speed_y, self.points, self.color_index,
+                               self.wave_speed):
+                    del column[i]
+                self.count -= 1
+                self.dropped += 1
+            else:
+                self.x[i], self.y[i] = spot
+
+    def store(self):
+        return FlagStore(self.x, self.y, self.speed_x, self.speed_y, self.points, self.color_index,
+                         self.wave_speed)
+
+
+# Lays out a level's obstacles one at a time, see FlagLayout. New obstacles
+# keep OBSTACLE_SPACING from each other and from the player; one that finds
+# no room is left out.
+class ObstacleLayout:
+    __slots__ = ('config', 'rng', 'spawner', 'tried', 'x', 'y', 'width', 'height', 'speed_x', 'speed_y')
+
+    def __init__(self, level, rng=random, difficulty=DEFAULT_DIFFICULTY):
+        self.config = level_config(level, difficulty)
+        self.rng = rng
+        self.spawner = Spawner(rng)
+        self.tried = 0
+        self.x, self.y, self.width, self.height, self.speed_x, self.speed_y = [], [], [], [], [], []
+
+    def block(self, player):
+        self.spawner.block(player[0], player[1])
+
+    def add(self):
+        # Try to place one more obstacle; False once all have been tried
+        config = self.config
+        if self.tried >= config.obstacles:
+            return False
+        self.tried += 1
+        rng = self.rng
+        w = rng.randint(config.obstacle_min_size, config.obstacle_max_size)
+        h = rng.randint(config.obstacle_min_size, config.obstacle_max_size)
+        spot = self.spawner.place(w, h, 50, 50, WINDOW_WIDTH - w - 50, PLAYING_AREA - h - 50,
+                                  spacing=OBSTACLE_SPACING)
+        if spot is not None:
+            self.x.append(spot[0])
+            self.y.append(spot[1])
+            self.width.append(w)
+            self.height.append(h)
+            self.speed_x.append(rng.uniform(-1, 1) * config.obstacle_speed)
+            self.speed_y.append(rng.uniform(-1, 1) * config.obstacle_speed)
+        return True
+
+    def fit(self, player, obstacles=None, margin=0):
+        # The finished obstacles, with any the player has since come within
+        # OBSTACLE_SPACING plus margin of put somewhere clear again;
+        # obstacles is the store already built from the layout, see
+        # FlagLayout.fit
+        if obstacles is None:
+            obstacles = self.store()
+        clearance = OBSTACLE_SPACING + margin
+        crowded = box_distance(obstacles.x, obstacles.y, obstacles.width, obstacles.height, player[0], player[1],
+                               0, 0) < clearance
+        if not crowded.any():
+            return obstacles
+        moved = np.flatnonzero(crowded).tolist()
+        spawner = self.spawner = Spawner(self.rng)
+        spawner.block(player[0], player[1], gap=clearance)
+        for i in range(len(self.x)):
+            if i not in moved:
+                spawner.block(self.x[i], self.y[i], self.width[i], self.height[i])
+        for i in reversed(moved):
+            w = self.width[i]
+            h = self.height[i]
+            spot = spawner.place(w, h, 50, 50, WINDOW_WIDTH - w - 50, PLAYING_AREA - h - 50,
+                                 spacing=OBSTACLE_SPACING)
+            if spot is None:
+                for column in (self.x, self.y, self.width, self.height, self.speed_x, self.speed_y):
+                    del column[i]
+            else:
+                self.x[i], self.y[i] = spot
+        return self.store()
+
+    def store(self):
+        return ObstacleStore(self.x, self.y, self.width, self.height, self.speed_x, self.speed_y)
+
+
+# Function to create new flags; count defaults to the level's flag count.
+# New flags stay spacing apart from each other, clearance away from player
+# and clear of obstacles. Spacing caps how many fit in the playing area, so
+# asking for more returns fewer: count=3000 with spacing=20 makes under 500.
+# Compare len() of the result with count, or use FlagLayout.dropped.
+def create_flags(level=1, count=None, rng=random, difficulty=DEFAULT_DIFFICULTY, spacing=0, clearance=0,
+                 player=None, obstacles=None):
+    layout = FlagLayout(level, count, rng, difficulty, spacing)
+    layout.block(player, clearance, obstacles)
+    while layout.add():
+        pass
+    return layout.store()
+
+
+# Function to create obstacles with level-based difficulty
+def create_obstacles(level, rng=random, difficulty=DEFAULT_DIFFICULTY, player=None):
+    layout = ObstacleLayout(level, rng, difficulty)
+    if player is not None:
+        layout.block(player)
+    while layout.add():
+        pass
+    return layout.store()
+
+
+# Turn on the spatial hash of a game's store if its level is crowded enough
+def track_crowd(store, threshold):
+    if store.grid is None and len(store) >= threshold:
+        store.enable_grid()
+    return store
+
+
+# What clearing the current level's flags brings, prepared while the level
+# is played: each tick places one obstacle or flag until the stores can be
+# built, then keeps them fitted around the player, re-placing what the
+# player comes within FIT_MARGIN of crowding, and take() swaps them in when
+# the time comes. The level-up tick is left checking the stores against
+# where the player and obstacles are now, a few array comparisons, and
+# re-placing only what the last moves crowded.
+class NextLevel:
+    __slots__ = ('level', 'obstacles', 'flags', 'obstacle_store', 'flag_store', 'fitted_at')
+
+    def __init__(self, state, level, new_obstacles):
+        self.level = level
+        self.obstacles = ObstacleLayout(level, state.rng, state.difficulty) if new_obstacles else None
+        self.flags = FlagLayout(level, None, state.rng, state.difficulty, state.flag_spacing)
+        self.obstacle_store = None
+        self.flag_store = None
+        self.fitted_at = None  # Player position the stores were last fitted around
+
+    def advance(self):
+        # Do one placement, building each store once its layout is complete;
+        # False once both are built
+        if self.flag_store is not None:
+            return False
+        if self.obstacles is not None and self.obstacle_store is None:
+            if self.obstacles.add():
+                return True
+            # Flags only see new obstacles once they are all placed
+            self.obstacle_store = track_crowd(self.obstacles.store(), GRID_MIN_OBSTACLES)
+            self.flags.block(obstacles=self.obstacle_store)
+        if self.flags.add():
+            return True
+        self.flag_store = track_crowd(self.flags.store(), GRID_MIN_FLAGS)
+        return False
+
+    def wait(self, state):
+        # The work of one tick of the current level
+        if self.flag_store is None:
+            self.advance()
+        elif self.moved(state) > FIT_MARGIN / 2:
+            self.fit(state, FIT_MARGIN)
+
+    def moved(self, state):
+        # How far the player is from where the stores were last fitted
+        # around, measured along both axes so it is never less than the
+        # straight distance
+        if self.fitted_at is None:
+            return float('inf')
+        return abs(state.player_x - self.fitted_at[0]) + abs(state.player_y - self.fitted_at[1])
+
+    def fit(self, state, margin=0):
+        # Re-place what crowds the player or the current obstacles and return
+        # the new obstacles and flags
+        player = (state.player_x, state.player_y)
+        if self.obstacles is None:
+            obstacles = state.obstacles
+            placed_around = False
+        else:
+            obstacles = track_crowd(self.obstacles.fit(player, self.obstacle_store, margin), GRID_MIN_OBSTACLES)
+            placed_around = obstacles is self.obstacle_store
+            self.obstacle_store = obstacles
+        flags = self.flags.fit(player, state.player_clearance + margin, obstacles, self.flag_store, placed_around)
+        self.flag_store = track_crowd(flags, GRID_MIN_FLAGS)
+        self.fitted_at = player
+        return obstacles, self.flag_store
+
+    def take(self, state):
+        # Finish the layout if the level was cleared before it was done and
+        # return it fitted to the current player and obstacle positions.
+        # New obstacles and the flags placed around them hold still while
+        # they wait, so nothing can crowd a player still within FIT_MARGIN
+        # of where they were last fitted around.
+        while self.advance():
+            pass
+        if self.obstacles is not None and self.moved(state) < FIT_MARGIN:
+            return self.obstacle_store, self.flag_store
+        return self.fit(state)
+
+
+# Complete state of one game; high score survives resets. Every random
+# decision is drawn from the game's own RNG, so the seed plus the keys fed
+# to step() fully determine a run.
+class GameState:
+    __slots__ = ('seed', 'rng', 'rules', 'difficulty', 'high_score', 'player_x', 'player_y', 'prev_player_x',
+                 'prev_player_y', 'player_speed', 'level', 'flags', 'obstacles', 'score', 'time', 'game_over',
+                 'paused', 'power_up_active', 'power_up_timer', 'prev_keys', 'tick', 'next_level')
+
+    def __init__(self, seed=None, rules=DEFAULT_RULES):
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.rules = rules
+        self.difficulty = rules.difficulty
+        self.high_score = 0
+        self.reset()
+
+    def reset(self):
+        self.player_x = WINDOW_WIDTH // 2
+        self.player_y = PLAYING_AREA // 2
+        self.prev_player_x = self.player_x
+        self.prev_player_y = self.player_y
+        self.player_speed = PLAYER_SPEED
+        self.level = 1
+        self.obstacles = self.spawn_obstacles()
+        self.flags = self.spawn_flags()
+        self.next_level = self.prepare_next_level()
+        self.score = 0
+        self.time = 0  # Simulated milliseconds since the round started
+        self.game_over = False
+        self.paused = False
+        self.power_up_active = False
+        self.power_up_timer = 0
+        self.prev_keys = 0
+        self.tick = 0
+
+    def spawn_obstacles(self):
+        obstacles = create_obstacles(self.level, rng=self.rng, difficulty=self.difficulty,
+                                     player=(self.player_x, self.player_y))
+        return track_crowd(obstacles, GRID_MIN_OBSTACLES)
+
+    @property
+    def flag_spacing(self):
+        return max(self.rules.flag_spacing, MIN_FLAG_SPACING)
+
+    @property
+    def player_clearance(self):
+        # New flags keep out of the capture reach, so none is caught for free
+        rules = self.rules
+        return max(rules.player_clearance, rules.player_radius + FLAG_RADIUS)
+
+    def spawn_flags(self):
+        # After the obstacles, which the flags keep clear of
+        flags = create_flags(self.level, rng=self.rng, difficulty=self.difficulty, spacing=self.flag_spacing,
+                             clearance=self.player_clearance, player=(self.player_x, self.player_y),
+                             obstacles=self.obstacles)
+        return track_crowd(flags, GRID_MIN_FLAGS)
+
+    def prepare_next_level(self):
+        # Start laying out what clearing this level brings, if anything
+        on_clear = self.rules.on_clear
+        if on_clear == 'level':
+            level = self.level + 1
+            return NextLevel(self, level, level_config(level, self.difficulty).new_obstacles)
+        if on_clear == 'respawn':
+            return NextLevel(self, self.level, False)
+        return None
+
+    def end(self, events):
+        self.game_over = True
+        if self.score > self.high_score:
+            self.high_score = self.score
+        events.append(('game_over', self.score))
+
+    @property
+    def time_left(self):
+        # None when the rules set no time limit
+        if self.rules.game_duration is None:
+            return None
+        return max(0, self.rules.game_duration - self.time)
+
+    @property
+    def flags_captured(self):
+        return self.flags.captured_count()
+
+
+# Advance the game by dt milliseconds of simulated time.
+# keys is a bitmask of KEY_* values held during this step. Returns a list of
+# events for the presentation layer: ('capture', x, y, color), ('power_up',),
+# ('respawn',), ('level_up', level), ('game_over', score) and ('reset',).
+def step(state, keys, dt=TICK_MS):
+    events = []
+    rules = state.rules
+    pressed = keys & ~state.prev_keys
+    state.prev_keys = keys
+
+    # Pause game with P key
+    if pressed & KEY_PAUSE and rules.pause and not state.game_over:
+        state.paused = not state.paused
+    if state.paused:
+        return events
+
+    # Check for reset key
+    if keys & KEY_RESET and state.game_over and rules.restart:
+        state.reset()
+        state.prev_keys = keys
+        events.append(('reset',))
+        return events
+
+    if state.game_over:
+        return events
+
+    state.tick += 1
+    frames = dt / FRAME_MS
+    speed = state.player_speed * frames
+    radius = rules.player_radius
+
+    # Store previous position
+    prev_x, prev_y = state.player_x, state.player_y
+    state.prev_player_x, state.prev_player_y = prev_x, prev_y
+
+    # Move the player based on arrow key presses
+    if keys & KEY_LEFT and state.player_x - speed > radius:
+        state.player_x -= speed
+    if keys & KEY_RIGHT and state.player_x + speed < WINDOW_WIDTH - radius:
+        state.player_x += speed
+    if keys & KEY_UP and state.player_y - speed > radius:
+        state.player_y -= speed
+    if keys & KEY_DOWN and state.player_y + speed < PLAYING_AREA - radius:
+        state.player_y += speed
+
+    # Stop the player where its path first touches an obstacle, so none is
+    # skipped however far the player gets in one tick, and let it slide
+    # along the obstacle's edge on the axis that is not blocked
+    state.player_x, state.player_y = state.obstacles.slide(
+        prev_x, prev_y, state.player_x - prev_x, state.player_y - prev_y, radius)
+
+    # Move obstacles
+    state.obstacles.move(frames)
+
+    # Check time remaining
+    state.time += dt
+    if state.time_left == 0:
+        state.end(events)
+
+    # Check power-up status
+    if state.power_up_active and state.time - state.power_up_timer > POWER_UP_DURATION:
+        state.power_up_active = False
+        state.player_speed = PLAYER_SPEED  # Reset speed
+
+    # Move and check for flag captures
+    flags = state.flags
+    if rules.moving_flags:
+        flags.move(frames)
+        if rules.flag_bounce:
+            flags.bounce(state.obstacles, FLAG_RADIUS)
+    for i in flags.capture(state.player_x, state.player_y, radius + FLAG_RADIUS,
+                           state.player_x - prev_x, state.player_y - prev_y):
+        state.score += int(flags.points[i])
+        events.append(('capture', float(flags.x[i]), float(flags.y[i]),
+                       FLAG_COLORS[flags.color_index[i]]))
+
+        # Chance for power-up on special flag capture
+        if flags.special[i] and state.rng.random() < 0.5:
+            state.power_up_active = True
+            state.power_up_timer = state.time
+            state.player_speed = BOOST_SPEED  # Speed boost
+            events.append(('power_up',))
+
+    # Check if all flags are captured - level up, bring new flags or end the game
+    if flags.captured_count() == len(flags):
+        if rules.on_clear == 'level':
+            next_level = state.next_level or state.prepare_next_level()
+            state.level += 1
+            state.obstacles, state.flags = next_level.take(state)
+            state.next_level = None
+            events.append(('level_up', state.level))
+        elif rules.on_clear == 'respawn':
+            next_level = state.next_level or state.prepare_next_level()
+            state.obstacles, state.flags = next_level.take(state)
+            state.next_level = None
+            events.append(('respawn',))
+        elif not state.game_over:
+            state.end(events)
+    elif rules.on_clear != 'end':
+        # Prepare a little more of the next level, which is only started
+        # the tick after a level-up so that tick is left just the swap
+        if state.next_level is None:
+            state.next_level = state.prepare_next_level()
+        state.next_level.wait(state)
+
+    return events
@@ -0,0 +1,141 @@
+# Uniform-grid spatial hash over the playing area
+#
+# Every entity is tracked by its bounding box. Points (flags) are boxes of
+# zero size, rectangles (obstacles) may straddle several cells. After each
+# move only the entities whose covered cells changed are re-bucketed, so
+# keeping the grid current costs one vectorized comparison plus a little
+# Python work per entity that crossed a cell border.
+import math
+
+import numpy as np
+
+from .constants import WINDOW_WIDTH, PLAYING_AREA
+
+# Cell edge in pixels; a little larger than the player's capture reach
+CELL_SIZE = 50
+
+
+class SpatialHash:
+    def __init__(self, cell_size=CELL_SIZE, width=WINDOW_WIDTH, height=PLAYING_AREA):
+        self.cell_size = cell_size
+        self.inv_cell_size = 1.0 / cell_size
+        self.cols = int(math.ceil(width / cell_size))
+        self.rows = int(math.ceil(height / cell_size))
+        self.limits = np.array([self.cols - 1, self.rows - 1, self.cols - 1, self.rows - 1], dtype=np.intp)
+        self.buckets = [set() for _ in range(self.cols * self.rows)]
+        self.ranges = np.zeros((0, 4), dtype=np.intp)  # col0, row0, col1, row1 per id
+        self.active = np.zeros(0, dtype=bool)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.active))
+
+    def _cell_ranges(self, min_x, min_y, max_x, max_y):
+        # Cells covered by each box, clamped so strays just outside the
+        # playing area still land in an edge cell. Truncation is fine for the
+        # negative side since those clamp to zero anyway. One stacked array
+        # and plain minimum/maximum keep this to a few NumPy calls, which
+        # matters as it runs after every move.
+        ranges = np.empty((len(min_x), 4))
+        ranges[:, 0] = min_x
+        ranges[:, 1] = min_y
+        if max_x is min_x and max_y is min_y:
+            ranges[:, 2:] = ranges[:, :2]
+        else:
+            ranges[:, 2] = max_x
+            ranges[:, 3] = max_y
+        ranges *= self.inv_cell_size
+        ranges = ranges.astype(np.intp)
+        np.maximum(ranges, 0, out=ranges)
+        np.minimum(ranges, self.limits, out=ranges)
+        return ranges
+
+    def _cells(self, col0, row0, col1, row1):
+        cols = self.cols
+        for row in range(row0, row1 + 1):
+            base = row * cols
+            for col in range(col0, col1 + 1):
+                yield base + col
+
+    def _insert(self, i, col0, row0, col1, row1):
+        for cell in self._cells(col0, row0, col1, row1):
+            self.buckets[cell].add(i)
+
+    def _remove(self, i, col0, row0, col1, row1):
+        for cell in self._cells(col0, row0, col1, row1):
+            self.buckets[cell].discard(i)
+
+    def rebuild(self, min_x, min_y, max_x=None, max_y=None):
+        # Start over with one entity per array element
+        if max_x is None:
+            max_x, max_y = min_x, min_y
+        for bucket in self.buckets:
+            bucket.clear()
+        self.ranges = self._cell_ranges(min_x, min_y, max_x, max_y)
+        self.active = np.ones(len(self.ranges), dtype=bool)
+        for i, (col0, row0, col1, row1) in enumerate(self.ranges.tolist()):
+            self._insert(i, col0, row0, col1, row1)
+
+    def update(self, min_x, min_y, max_x=None, max_y=None):
+        # Re-bucket only the entities that moved into different cells
+        if max_x is None:
+            max_x, max_y = min_x, min_y
+        if len(min_x) != len(self.ranges):
+            self.rebuild(min_x, min_y, max_x, max_y)
+            return
+        ranges = self._cell_ranges(min_x, min_y, max_x, max_y)
+        moved = np.flatnonzero(self.active & np.any(ranges != self.ranges, axis=1))
+        if len(moved):
+            buckets = self.buckets
+            cols = self.cols
+            for i, old, new in zip(moved.tolist(), self.ranges[moved].tolist(), ranges[moved].tolist()):
+                # Most entities cover a single cell; skip the range walk for them
+                if old[0] == old[2] and old[1] == old[3]:
+                    buckets[old[1] * cols + old[0]].discard(i)
+                else:
+                    self._remove(i, *old)
+                if new[0] == new[2] and new[1] == new[3]:
+                    buckets[new[1] * cols + new[0]].add(i)
+                else:
+                    self._insert(i, *new)
+        self.ranges = ranges
+
+    def discard(self, ids):
+        # Stop tracking entities (e.g. captured flags) until the next rebuild
+        for i in np.atleast_1d(ids).tolist():
+            if self.active[i]:
+                self._remove(i, *self.ranges[i].tolist())
+                self.active[i] = False
+
+    def candidates(self, min_x, min_y, max_x, max_y):
+        # Ids of every entity sharing a cell with the query box, sorted so
+        # callers see them in a stable order
+        inv = self.inv_cell_size
+        col0 = min(max(int(min_x * inv), 0), self.cols - 1)
+        row0 = min(max(int(min_y * inv), 0), self.rows - 1)
+        col1 = min(max(int(max_x * inv), 0), self.cols - 1)
+        row1 = min(max(int(max_y * inv), 0), self.rows - 1)
+        buckets = self.buckets
+        found = set()
+        for cell in self._cells(col0, row0, col1, row1):
+            found.update(buckets[cell])
+        return np.fromiter(sorted(found), dtype=np.intp, count=len(found))
+
+    def query_radius(self, x, y, radius, xs, ys):
+        # Ids of points strictly within radius of (x, y)
+        ids = self.candidates(x - radius, y - radius, x + radius, y + radius)
+        if len(ids) == 0:
+            return ids
+        dx = xs[ids] - x
+        dy = ys[ids] - y
+        return ids[dx * dx + dy * dy < radius * radius]
+
+    def query_circle_rects(self, x, y, radius, rx, ry, rw, rh):
+        # Ids of rectangles overlapping the circle at (x, y)
+        ids = self.candidates(x - radius, y - radius, x + radius, y + radius)
+        if len(ids) == 0:
+            return ids
+        closest_x = np.clip(x, rx[ids], rx[ids] + rw[ids])
+        closest_y = np.clip(y, ry[ids], ry[ids] + rh[ids])
+        dx = x - closest_x
+        dy = y - closest_y
+        return ids[dx * dx + dy * dy < radius * radius]
@@ -0,0 +1,86 @@
+# Non-overlapping spawn placement
+#
+# New flags and obstacles are placed by Poisson-disk dart throwing: random
+# candidate positions are drawn and one is kept only if it stays far enough
+# from everything placed so far and from the areas blocked off, such as
+# around the player. A background grid of CELL_SIZE cells records which
+# boxes reach into each cell, so a candidate is only compared with its
+# neighbours and placing thousands of entities stays linear. Every placement
+# gives up after SPAWN_ATTEMPTS candidates, so a crowded area costs bounded
+# time instead of looping forever.
+#
+# Boxes are given by their top-left corner and size; flags and the player
+# are boxes of no size. Distances are between the closest points of two
+# boxes.
+import math
+
+import numpy as np
+
+CELL_SIZE = 50
+
+# Candidates tried per placement before giving up on it
+SPAWN_ATTEMPTS = 100
+
+
+# Distance between the closest points of two boxes, element-wise over
+# NumPy arrays, for checking whole layouts at once
+def box_distance(x, y, width, height, other_x, other_y, other_width, other_height):
+    dx = np.maximum(np.maximum(other_x - (x + width), x - (other_x + other_width)), 0)
+    dy = np.maximum(np.maximum(other_y - (y + height), y - (other_y + other_height)), 0)
+    return np.hypot(dx, dy)
+
+
+class Spawner:
+    def __init__(self, rng, cell_size=CELL_SIZE):
+        self.rng = rng
+        self.inv_cell_size = 1 / cell_size
+        self.cells = {}
+        self.boxes = []  # min_x, min_y, max_x, max_y, gap
+
+    def block(self, x, y, width=0, height=0, gap=0):
+        # Keep later placements at least gap away from the box. It is filed
+        # under every cell its gap reaches, so a candidate closer than that
+        # always shares a cell with it.
+        index = len(self.boxes)
+        self.boxes.append((x, y, x + width, y + height, gap))
+        for cell in self._cells(x - gap, y - gap, x + width + gap, y + height + gap):
+            self.cells.setdefault(cell, []).append(index)
+
+    def place(self, width, height, min_x, min_y, max_x, max_y, spacing=0, gap=0):
+        # Top-left corner, with whole-pixel coordinates between (min_x, min_y)
+        # and (max_x, max_y), for a width x height box at least spacing away
+        # from every box so far (and at least as far as their own gap), or
+        # None if no candidate fits. The box is blocked off with gap for the
+        # placements after it.
+        rng = self.rng
+        for _ in range(SPAWN_ATTEMPTS):
+            x = rng.randint(min_x, max_x)
+            y = rng.randint(min_y, max_y)
+            if self._fits(x, y, x + width, y + height, spacing):
+                self.block(x, y, width, height, gap)
+                return x, y
+        return None
+
+    def _fits(self, min_x, min_y, max_x, max_y, spacing):
+        boxes = self.boxes
+        seen = set()
+        for cell in self._cells(min_x - spacing, min_y - spacing, max_x + spacing, max_y + spacing):
+            for index in self.cells.get(cell, ()):
+                if index in seen:
+                    continue
+                seen.add(index)
+                other_min_x, other_min_y, other_max_x, other_max_y, gap = boxes[index]
+                need = max(spacing, gap)
+                dx = max(other_min_x - max_x, min_x - other_max_x, 0)
+                dy = max(other_min_y - max_y, min_y - other_max_y, 0)
+                if dx * dx + dy * dy < need * need:
+                    return False
+        return True
+
+    def _cells(self, min_x, min_y, max_x, max_y):
+        inv = self.inv_cell_size
+        col0 = math.floor(min_x * inv)
+        row0 = math.floor(min_y * inv)
+        col1 = math.floor(max_x * inv)
+        row1 = math.floor(max_y * inv)
+        return [(col, row) for row in range(row0, row1 + 1) for col in range(col0, col1 + 1)]
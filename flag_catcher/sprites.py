@@ -0,0 +1,150 @@
+# Pre-rendered sprite atlas
+#
+# Flags, the butterfly net and background stars used to be drawn from
+# primitives every frame. Here each is rendered once per colour, animation
+# phase and variant into a cached Surface, so drawing them is a blit.
+import math
+
+import pygame
+
+from .constants import BROWN, GOLD, WHITE, LIGHT_BLUE, FLAG_COLORS
+
+# Number of pre-rendered animation phases per cycle
+WAVE_PHASES = 16
+NET_PHASES = 16
+
+# Brightness steps pre-rendered for stars between 100 and 255
+STAR_LEVELS = 16
+STAR_MIN_BRIGHTNESS = 100
+STAR_MAX_SIZE = 3
+
+# Where the flag's pole base sits inside its sprite
+FLAG_ORIGIN = (2, 32)
+FLAG_SIZE = (27, 34)
+
+# Where the net's centre sits inside its sprite
+NET_RADIUS = 25
+NET_HANDLE_LENGTH = 40
+NET_SPOKES = 12
+NET_ORIGIN = (NET_RADIUS + 2, NET_RADIUS + 2)
+NET_SIZE = (2 * NET_RADIUS + 4, NET_RADIUS + NET_HANDLE_LENGTH + 6)
+
+TWO_PI = math.pi * 2
+
+
+# Index of the pre-rendered phase closest to an animation angle
+def phase_index(angle, phases):
+    return int(round(angle / TWO_PI * phases)) % phases
+
+
+def render_flag(color, special, wave):
+    surface = pygame.Surface(FLAG_SIZE, pygame.SRCALPHA)
+    x, y = FLAG_ORIGIN
+
+    # Draw flag pole (brown)
+    pygame.draw.line(surface, BROWN, (x, y), (x, y - 30), 3)
+
+    # Draw triangular flag with wave effect
+    flag_points = [
+        (x, y - 30),
+        (x + 20 + wave, y - 20),
+        (x, y - 10)
+    ]
+    pygame.draw.polygon(surface, color, flag_points)
+
+    # Draw special indicator for bonus flags
+    if special:
+        pygame.draw.circle(surface, GOLD, (x + 10, y - 20), 5)
+    return surface
+
+
+def render_net(power_up, wave_offset, spokes=NET_SPOKES):
+    surface = pygame.Surface(NET_SIZE, pygame.SRCALPHA)
+    x, y = NET_ORIGIN
+    radius = NET_RADIUS
+
+    # Draw the net handle (brown)
+    pygame.draw.line(surface, BROWN, (x, y), (x, y + NET_HANDLE_LENGTH), 5)
+
+    # Draw the net rim (white or gold if powered up)
+    rim_color = GOLD if power_up else WHITE
+    pygame.draw.circle(surface, rim_color, (x, y), radius, 3)
+
+    # Draw mesh lines
+    mesh_color = LIGHT_BLUE
+    if power_up:
+        mesh_color = (200, 200, 100)  # Golden mesh when powered up
+
+    for i in range(spokes):
+        angle = TWO_PI * i / spokes
+        end_x = x + (radius - 5) * math.cos(angle)
+        end_y = y + (radius - 5) * math.sin(angle) + wave_offset
+        pygame.draw.line(surface, mesh_color, (x, y), (end_x, end_y), 1)
+
+    # Draw inner circles for mesh effect
+    pygame.draw.circle(surface, mesh_color, (x, y + wave_offset // 2), radius * 0.7, 1)
+    pygame.draw.circle(surface, mesh_color, (x, y + wave_offset // 3), radius * 0.4, 1)
+    return surface
+
+
+def render_star(size, brightness):
+    surface = pygame.Surface((2 * size + 2, 2 * size + 2), pygame.SRCALPHA)
+    pygame.draw.circle(surface, (brightness, brightness, brightness), (size + 1, size + 1), size)
+    return surface
+
+
+class SpriteAtlas:
+    def __init__(self):
+        # Flags: [color index][special][phase]
+        self.flags = [
+            [[self._convert(render_flag(color, special, math.sin(TWO_PI * p / WAVE_PHASES) * 3))
+              for p in range(WAVE_PHASES)]
+             for special in (False, True)]
+            for color in FLAG_COLORS
+        ]
+
+        # Net: {spokes: [power_up][phase]}; coarser meshes are rendered the
+        # first time they are asked for
+        self.nets = {}
+        self._render_nets(NET_SPOKES)
+
+        # Stars: [size][brightness level]
+        self.stars = [
+            [self._convert(render_star(size, self.star_brightness(level)))
+             for level in range(STAR_LEVELS)]
+            for size in range(STAR_MAX_SIZE + 1)
+        ]
+
+    def _render_nets(self, spokes):
+        self.nets[spokes] = [
+            [self._convert(render_net(power_up, math.sin(TWO_PI * p / NET_PHASES) * 3, spokes))
+             for p in range(NET_PHASES)]
+            for power_up in (False, True)
+        ]
+        return self.nets[spokes]
+
+    @staticmethod
+    def _convert(surface):
+        # Match the display format when there is one, for the fastest blits
+        if pygame.display.get_surface() is not None:
+            return surface.convert_alpha()
+        return surface
+
+    @staticmethod
+    def star_brightness(level):
+        return STAR_MIN_BRIGHTNESS + (255 - STAR_MIN_BRIGHTNESS) * level // (STAR_LEVELS - 1)
+
+    @staticmethod
+    def star_level(brightness):
+        level = (brightness - STAR_MIN_BRIGHTNESS) * (STAR_LEVELS - 1) // (255 - STAR_MIN_BRIGHTNESS)
+        return max(0, min(STAR_LEVELS - 1, level))
+
+    def flag(self, color_index, special, angle):
+        return self.flags[color_index][bool(special)][phase_index(angle, WAVE_PHASES)]
+
+    def net(self, power_up, animation_frame, spokes=NET_SPOKES):
+        nets = self.nets.get(spokes) or self._render_nets(spokes)
+        return nets[bool(power_up)][phase_index(animation_frame, NET_PHASES)]
+
+    def star(self, size, brightness):
+        return self.stars[size][self.star_level(brightness)]
@@ -0,0 +1,134 @@
+# Pre-baked parallax starfield
+#
+# Stars are grouped into a few speed bands and each band is drawn once onto
+# a colour-keyed layer as wide as the window. Scrolling a band is two blits
+# with a wrap offset, and twinkling is a small overlay of re-brightened stars
+# that is re-picked periodically, so the background costs the same handful
+# of blits whether it holds 50 stars or thousands. set_detail() hides the
+# faster bands and stops the twinkling to cut that cost further.
+import random
+
+import pygame
+
+from .constants import WINDOW_WIDTH, PLAYING_AREA
+
+# Parallax speed bands between the slowest (0.2) and fastest (1.0) stars
+STAR_BANDS = 4
+MIN_STAR_SPEED = 0.2
+MAX_STAR_SPEED = 1.0
+
+# Pixels per frame the fastest band scrolls; 0 holds the stars still
+SCROLL_SPEED = 0.5
+
+# Stars redrawn with jittered brightness on top of the layers, and how many
+# frames pass before a new set is picked
+TWINKLE_STARS = 24
+TWINKLE_PERIOD = 6
+
+# Transparent colour of the layers; stars are never darker than 100
+LAYER_KEY = (0, 0, 0)
+
+
+class Starfield:
+    __slots__ = ('atlas', 'rng', 'width', 'height', 'scroll_speed', 'stars', 'band_speeds', 'star_bands', 'layers',
+                 'offsets', 'bands_shown', 'twinkling', 'twinkle', 'twinkle_timer')
+
+    def __init__(self, atlas, count=50, width=WINDOW_WIDTH, height=PLAYING_AREA, rng=random,
+                 scroll_speed=SCROLL_SPEED):
+        self.atlas = atlas
+        self.rng = rng
+        self.width = width
+        self.height = height
+        self.scroll_speed = scroll_speed
+        self.stars = []
+        for _ in range(count):
+            self.stars.append((
+                rng.randint(0, width),        # x
+                rng.randint(0, height),       # y
+                rng.randint(1, 3),            # size
+                rng.randint(100, 255),        # brightness
+                rng.uniform(MIN_STAR_SPEED, MAX_STAR_SPEED),  # speed
+            ))
+
+        # Each band scrolls at the average speed of the range it covers
+        band_width = (MAX_STAR_SPEED - MIN_STAR_SPEED) / STAR_BANDS
+        self.band_speeds = [MIN_STAR_SPEED + band_width * (band + 0.5) for band in range(STAR_BANDS)]
+        self.star_bands = [min(STAR_BANDS - 1, int((star[4] - MIN_STAR_SPEED) / band_width))
+                           for star in self.stars]
+        self.layers = [self._bake(band) for band in range(STAR_BANDS)]
+        self.offsets = [0.0] * STAR_BANDS
+        self.bands_shown = STAR_BANDS
+        self.twinkling = True
+
+        self.twinkle = []
+        self.twinkle_timer = 0
+
+    def _bake(self, band):
+        layer = pygame.Surface((self.width, self.height))
+        if pygame.display.get_surface() is not None:
+            layer = layer.convert()
+        layer.fill(LAYER_KEY)
+        for star, star_band in zip(self.stars, self.star_bands):
+            if star_band == band:
+                x, y, size, brightness, _ = star
+                sprite = self.atlas.star(size, brightness)
+
+                # Draw stars that straddle the seam on both sides of it
+                layer.blit(sprite, (x - size - 1, y - size - 1))
+                layer.blit(sprite, (x - size - 1 - self.width, y - size - 1))
+        layer.set_colorkey(LAYER_KEY, pygame.RLEACCEL)
+        return layer
+
+    def set_detail(self, bands=STAR_BANDS, twinkle=True):
+        # Draw only the `bands` slowest bands, with or without twinkling
+        self.bands_shown = max(0, min(STAR_BANDS, bands))
+        self.twinkling = twinkle
+        self.twinkle = []
+        self.twinkle_timer = 0
+
+    def _pick_twinkle(self):
+        shown = [i for i, band in enumerate(self.star_bands) if band < self.bands_shown]
+        count = min(TWINKLE_STARS, len(shown))
+        rng = self.rng
+        self.twinkle = [(i, rng.randint(-20, 20)) for i in rng.sample(shown, count)]
+
+    def update(self, frames=1.0):
+        # Move stars for parallax effect
+        for band, speed in enumerate(self.band_speeds):
+            self.offsets[band] = (self.offsets[band] + self.scroll_speed * speed * frames) % self.width
+
+        # Make a different set of stars twinkle every few frames
+        if not self.twinkling:
+            return
+        self.twinkle_timer -= frames
+        if self.twinkle_timer <= 0:
+            self._pick_twinkle()
+            self.twinkle_timer = TWINKLE_PERIOD
+
+    def draw(self, surface):
+        # Returns the area drawn, which is the whole field since every band moves
+        shown = self.bands_shown
+        for layer, offset in zip(self.layers[:shown], self.offsets[:shown]):
+            x = -int(offset)
+            surface.blit(layer, (x, 0))
+            surface.blit(layer, (x + self.width, 0))
+        self.draw_twinkle(surface)
+        return [pygame.Rect(0, 0, self.width, self.height)]
+
+    def restore(self, surface, rects):
+        # Redraw the stars under rects only, for a field that does not
+        # scroll, and the twinkling stars on top; returns the twinkling
+        # stars' rectangles
+        for layer in self.layers[:self.bands_shown]:
+            for rect in rects:
+                surface.blit(layer, rect, rect)
+        return self.draw_twinkle(surface)
+
+    def draw_twinkle(self, surface):
+        atlas = self.atlas
+        rects = []
+        for i, jitter in self.twinkle:
+            star_x, y, size, brightness, _ = self.stars[i]
+            x = (star_x - int(self.offsets[self.star_bands[i]])) % self.width
+            rects.append(surface.blit(atlas.star(size, brightness + jitter), (x - size - 1, y - size - 1)))
+        return rects
@@ -0,0 +1,75 @@
+# Fast game startup
+#
+# Importing pygame pulls in pkg_resources, which on its own takes around
+# 100 ms, only so pygame can locate its bundled font and icon; without it
+# pygame reads them from its package directory. This module is imported
+# ahead of pygame and keeps pkg_resources out while pygame loads.
+#
+# pygame.init() brings up every subsystem, audio and joysticks included, and
+# SysFont() scans the system's fonts even when asked for the default one,
+# which can take hundreds of milliseconds on a machine with many fonts
+# installed. The game needs neither: init_pygame() starts only the display,
+# which brings events, keyboard and timers with it, plus the font module,
+# and LazyFont loads pygame's bundled default font the first time text is
+# drawn at its size. StartupTimer breaks down where the time to the first
+# presented frame went.
+import sys
+import time
+
+_hide_pkg_resources = 'pkg_resources' not in sys.modules
+if _hide_pkg_resources:
+    sys.modules['pkg_resources'] = None  # Makes `import pkg_resources` fail fast
+try:
+    import pygame
+finally:
+    if _hide_pkg_resources:
+        del sys.modules['pkg_resources']  # Later imports load it as usual
+
+
+class StartupTimer:
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.last = self.start
+        self.phases = []  # (name, milliseconds)
+
+    def mark(self, phase):
+        # Charge the time since the previous mark to phase
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self.last) * 1000))
+        self.last = now
+
+    @property
+    def total_ms(self):
+        return (self.last - self.start) * 1000
+
+    def report(self, stream=sys.stderr):
+        print(f"Startup took {self.total_ms:.1f} ms", file=stream)
+        for phase, ms in self.phases:
+            print(f"  {phase:<12} {ms:7.1f} ms", file=stream)
+
+
+# Start only the pygame subsystems the game uses
+def init_pygame():
+    pygame.display.init()
+    pygame.font.init()
+
+
+# A pygame Font that is only loaded when first used. path=None is pygame's
+# bundled default font, the same one SysFont(None, size) falls back to.
+class LazyFont:
+    def __init__(self, point_size, path=None):
+        self.point_size = point_size
+        self.path = path
+        self.font = None
+
+    def load(self):
+        if self.font is None:
+            self.font = pygame.font.Font(self.path, self.point_size)
+        return self.font
+
+    def render(self, text, antialias, color, background=None):
+        return self.load().render(text, antialias, color, background)
+
+    def __getattr__(self, name):
+        # Everything else goes straight to the loaded font
+        return getattr(self.load(), name)
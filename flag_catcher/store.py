@@ -0,0 +1,424 @@
+# Structure-of-arrays entity storage
+#
+# Flags, obstacles and capture particles are kept as parallel NumPy arrays
+# rather than one Python object per entity, so movement, wall bounces and
+# capture/collision tests run as a handful of batched array operations no
+# matter how many entities a level holds.
+import math
+import random
+
+import numpy as np
+
+from .broadphase import close_pairs, interval_pairs
+from .constants import WINDOW_WIDTH, PLAYING_AREA
+from .spatial import SpatialHash
+from .swept import sweep_circles, sweep_circle_rect, sweep_circle_rect_x
+
+# Capture particles alive at once; ten per capture
+MAX_PARTICLES = 2048
+
+# Pixels the player is left short of an obstacle it runs into
+CONTACT_GAP = 0.01
+
+# Times every flag-flag contact of a tick is resolved, and the odd
+# multiplier that scrambles the order they are resolved in
+CONTACT_PASSES = 2
+PAIR_SCRAMBLE = np.uint64(0x9E3779B1)
+
+
+# All flags of the current level
+class FlagStore:
+    __slots__ = ('x', 'y', 'prev_x', 'prev_y', 'speed_x', 'speed_y', 'points', 'special', 'color_index',
+                 'angle', 'wave_speed', 'captured', 'grid')
+
+    def __init__(self, x, y, speed_x, speed_y, points, color_index, wave_speed):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.prev_x = self.x.copy()
+        self.prev_y = self.y.copy()
+        self.speed_x = np.asarray(speed_x, dtype=np.float64)
+        self.speed_y = np.asarray(speed_y, dtype=np.float64)
+        self.points = np.asarray(points, dtype=np.int64)
+        self.special = self.points > 50
+        self.color_index = np.asarray(color_index, dtype=np.intp)
+        self.angle = np.zeros(len(self.x))
+        self.wave_speed = np.asarray(wave_speed, dtype=np.float64)
+        self.captured = np.zeros(len(self.x), dtype=bool)
+        self.grid = None
+
+    def __len__(self):
+        return len(self.x)
+
+    def enable_grid(self):
+        # Track free flags in a spatial hash, so capture() only tests the
+        # ones near the player; games turn it on for crowded levels, see
+        # sim.GRID_MIN_FLAGS
+        self.grid = SpatialHash()
+        self.grid.rebuild(self.x, self.y)
+        self.grid.discard(np.flatnonzero(self.captured))
+
+    def move(self, frames=1.0):
+        # Remember where the last tick left us for interpolated drawing
+        self.prev_x[:] = self.x
+        self.prev_y[:] = self.y
+        active = ~self.captured
+
+        # Move the flags
+        self.x += np.where(active, self.speed_x * frames, 0.0)
+        self.y += np.where(active, self.speed_y * frames, 0.0)
+
+        # Bounce off walls
+        bounce_x = active & ((self.x < 20) | (self.x > WINDOW_WIDTH - 20))
+        bounce_y = active & ((self.y < 40) | (self.y > PLAYING_AREA - 10))
+        self.speed_x[bounce_x] *= -1
+        self.speed_y[bounce_y] *= -1
+
+        # Advance the wave animation with the simulation
+        self.angle += np.where(active, self.wave_speed * frames, 0.0)
+
+    def bounce(self, obstacles, radius):
+        # Bounce free flags, as circles of radius, off the obstacles and off
+        # each other: overlapping ones are pushed apart and, if they were
+        # closing in, their speeds are reflected. Candidate pairs come from a
+        # sort-and-sweep along x, see broadphase.py.
+        free = np.flatnonzero(~self.captured)
+        if len(free) == 0:
+            return
+        if len(obstacles):
+            self._bounce_off_obstacles(free, obstacles, radius)
+        self._bounce_off_flags(free, radius)
+        # Pushes must not carry flags past the walls move() bounces them off
+        self.x[free] = np.clip(self.x[free], 20, WINDOW_WIDTH - 20)
+        self.y[free] = np.clip(self.y[free], 40, PLAYING_AREA - 10)
+
+    def _bounce_off_obstacles(self, free, obstacles, radius):
+        x = self.x[free]
+        y = self.y[free]
+        i, k = interval_pairs(x, obstacles.x - radius, obstacles.x + obstacles.width + radius)
+        left = obstacles.x[k]
+        top = obstacles.y[k]
+        right = left + obstacles.width[k]
+        bottom = top + obstacles.height[k]
+        dx = x[i] - np.clip(x[i], left, right)
+        dy = y[i] - np.clip(y[i], top, bottom)
+        hit = dx * dx + dy * dy < radius * radius
+        if not np.any(hit):
+            return
+        i, dx, dy = i[hit], dx[hit], dy[hit]
+        left, top, right, bottom = left[hit], top[hit], right[hit], bottom[hit]
+
+        # Push out along the line from the closest point on the obstacle; a
+        # centre inside the obstacle leaves through the nearest side
+        distance = np.hypot(dx, dy)
+        inside = distance == 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            normal_x = dx / distance
+            normal_y = dy / distance
+        depth = radius - distance
+        sides = np.stack((x[i] - left, right - x[i], y[i] - top, bottom - y[i]))
+        nearest = np.argmin(sides, axis=0)
+        normal_x = np.where(inside, np.choose(nearest, (-1.0, 1.0, 0.0, 0.0)), normal_x)
+        normal_y = np.where(inside, np.choose(nearest, (0.0, 0.0, -1.0, 1.0)), normal_y)
+        depth = np.where(inside, np.min(sides, axis=0) + radius, depth)
+
+        # One contact per flag, the deepest, so two obstacles cannot undo
+        # each other's reflection
+        order = np.argsort(-depth, kind='stable')
+        _, first = np.unique(i[order], return_index=True)
+        pick = order[first]
+        ids = free[i[pick]]
+        normal_x = normal_x[pick]
+        normal_y = normal_y[pick]
+        self.x[ids] += normal_x * depth[pick]
+        self.y[ids] += normal_y * depth[pick]
+        closing = np.minimum(self.speed_x[ids] * normal_x + self.speed_y[ids] * normal_y, 0.0)
+        self.speed_x[ids] -= 2 * closing * normal_x
+        self.speed_y[ids] -= 2 * closing * normal_y
+
+    def _bounce_off_flags(self, free, radius):
+        x = self.x[free]
+        y = self.y[free]
+        reach = 2 * radius
+        i, j = close_pairs(x, reach)
+        dx = x[j] - x[i]
+        dy = y[j] - y[i]
+        hit = dx * dx + dy * dy < reach * reach
+        if not np.any(hit):
+            return
+        i = i[hit]
+        j = j[hit]
+
+        # Equal masses: split the overlap and swap the closing speeds along
+        # the line between centres; flags on the same spot part along x.
+        # Contacts are resolved in rounds in which no flag takes part twice,
+        # each pair getting the whole exchange from the speeds the rounds
+        # before left it, so a flag in a crowd bounces off one neighbour
+        # after another and every exchange keeps the kinetic energy.
+        # Pairs go in the order of a fixed scramble of their index, a round
+        # taking every pair that comes first at both its flags, which
+        # keeps the rounds few even along chains of touching flags.
+        speed_x = self.speed_x[free]
+        speed_y = self.speed_y[free]
+        order = (np.arange(len(i), dtype=np.uint64) * PAIR_SCRAMBLE) % 2 ** 32
+        for _ in range(CONTACT_PASSES):
+            left_i, left_j, left_order = i, j, order
+            while len(left_i):
+                first = np.full(len(free), 2 ** 32, dtype=np.uint64)
+                np.minimum.at(first, left_i, left_order)
+                np.minimum.at(first, left_j, left_order)
+                now = (first[left_i] == left_order) & (first[left_j] == left_order)
+                a = left_i[now]
+                b = left_j[now]
+                left_i, left_j, left_order = left_i[~now], left_j[~now], left_order[~now]
+
+                dx = x[b] - x[a]
+                dy = y[b] - y[a]
+                distance = np.hypot(dx, dy)
+                same = distance == 0
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    normal_x = np.where(same, 1.0, dx / distance)
+                    normal_y = np.where(same, 0.0, dy / distance)
+                push = np.maximum(reach - distance, 0.0) / 2
+                x[a] -= normal_x * push
+                x[b] += normal_x * push
+                y[a] -= normal_y * push
+                y[b] += normal_y * push
+                closing = np.maximum((speed_x[a] - speed_x[b]) * normal_x + (speed_y[a] - speed_y[b]) * normal_y,
+                                     0.0)
+                speed_x[a] -= closing * normal_x
+                speed_x[b] += closing * normal_x
+                speed_y[a] -= closing * normal_y
+                speed_y[b] += closing * normal_y
+        self.x[free] = x
+        self.y[free] = y
+        self.speed_x[free] = speed_x
+        self.speed_y[free] = speed_y
+
+    def capture(self, player_x, player_y, reach, player_dx=0.0, player_dy=0.0):
+        # Mark every free flag that came within reach of the player this tick
+        # as captured and return the indices of the newly captured ones.
+        # (player_x, player_y) is where the player ended up after moving by
+        # (player_dx, player_dy); flags are followed from where move() found
+        # them, so neither side can skip past the other. Captured flags leave
+        # the grid, so only free flags are ever candidates.
+        start_x = player_x - player_dx
+        start_y = player_y - player_dy
+        if self.grid is None:
+            # A flag the player passed within reach of ends up no further
+            # than reach plus how far the two moved apart
+            dx = self.x - player_x
+            dy = self.y - player_y
+            slack = reach + np.abs(self.x - self.prev_x - player_dx) + np.abs(self.y - self.prev_y - player_dy)
+            ids = np.flatnonzero(~self.captured & (dx * dx + dy * dy < slack * slack))
+        else:
+            # Same bound around where the player ended up, using the furthest
+            # any flag moved. The grid is only brought up to date here, the
+            # one place it is read, however often the flags moved since.
+            self.grid.update(self.x, self.y)
+            step = float(np.max(np.abs(self.x - self.prev_x) + np.abs(self.y - self.prev_y), initial=0.0))
+            slack = reach + step + abs(player_dx) + abs(player_dy)
+            ids = self.grid.query_radius(player_x, player_y, slack, self.x, self.y)
+        if len(ids) == 0:
+            return ids
+        prev_x = self.prev_x[ids]
+        prev_y = self.prev_y[ids]
+        toi = sweep_circles(prev_x, prev_y, self.x[ids] - prev_x, self.y[ids] - prev_y,
+                            start_x, start_y, player_dx, player_dy, reach)
+        hit = ids[toi <= 1]
+        if self.grid is not None:
+            self.grid.discard(hit)
+        self.captured[hit] = True
+        return hit
+
+    def captured_count(self):
+        return int(np.count_nonzero(self.captured))
+
+
+# All obstacles of the current level
+class ObstacleStore:
+    __slots__ = ('x', 'y', 'prev_x', 'prev_y', 'width', 'height', 'speed_x', 'speed_y', 'grid')
+
+    def __init__(self, x, y, width, height, speed_x, speed_y):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.prev_x = self.x.copy()
+        self.prev_y = self.y.copy()
+        self.width = np.asarray(width, dtype=np.float64)
+        self.height = np.asarray(height, dtype=np.float64)
+        self.speed_x = np.asarray(speed_x, dtype=np.float64)
+        self.speed_y = np.asarray(speed_y, dtype=np.float64)
+        self.grid = None
+
+    @classmethod
+    def empty(cls):
+        return cls([], [], [], [], [], [])
+
+    def __len__(self):
+        return len(self.x)
+
+    def enable_grid(self):
+        # Track obstacle rectangles in a spatial hash, see FlagStore.enable_grid
+        self.grid = SpatialHash()
+        self.grid.rebuild(self.x, self.y, self.x + self.width, self.y + self.height)
+
+    def move(self, frames=1.0):
+        self.prev_x[:] = self.x
+        self.prev_y[:] = self.y
+
+        # Move the obstacles
+        self.x += self.speed_x * frames
+        self.y += self.speed_y * frames
+
+        # Bounce off walls
+        self.speed_x[(self.x < 0) | (self.x + self.width > WINDOW_WIDTH)] *= -1
+        self.speed_y[(self.y < 0) | (self.y + self.height > PLAYING_AREA)] *= -1
+        if self.grid is not None:
+            self.grid.update(self.x, self.y, self.x + self.width, self.y + self.height)
+
+    def _near(self, min_x, min_y, max_x, max_y):
+        # Ids of the obstacles whose bounding box overlaps the query box, the
+        # broad phase before any exact test; the grid, if any, narrows down
+        # which boxes get compared
+        if self.grid is None:
+            return np.flatnonzero((self.x < max_x) & (self.x + self.width > min_x)
+                                  & (self.y < max_y) & (self.y + self.height > min_y))
+        ids = self.grid.candidates(min_x, min_y, max_x, max_y)
+        x = self.x[ids]
+        y = self.y[ids]
+        return ids[(x < max_x) & (x + self.width[ids] > min_x) & (y < max_y) & (y + self.height[ids] > min_y)]
+
+    def sweep(self, player_x, player_y, dx, dy, player_radius):
+        # Time of impact, as a fraction of the move, of the player circle
+        # moving by (dx, dy) with the obstacles where they stand; inf if it
+        # touches none. An obstacle that moved onto the player only blocks
+        # moves towards its centre, so the player can always get back out.
+        ids = self._near(min(player_x, player_x + dx) - player_radius, min(player_y, player_y + dy) - player_radius,
+                         max(player_x, player_x + dx) + player_radius, max(player_y, player_y + dy) + player_radius)
+        if len(ids) == 0:
+            return np.inf
+        x = self.x[ids]
+        y = self.y[ids]
+        width = self.width[ids]
+        height = self.height[ids]
+        if not dy:
+            toi = sweep_circle_rect_x(player_x, player_y, dx, player_radius, x, y, width, height)
+        elif not dx:
+            toi = sweep_circle_rect_x(player_y, player_x, dy, player_radius, y, x, height, width)
+        else:
+            toi = sweep_circle_rect(player_x, player_y, dx, dy, player_radius, x, y, width, height)
+        toward = dx * (x + width / 2 - player_x) + dy * (y + height / 2 - player_y) > 0
+        return float(np.min(np.where((toi > 0) | toward, toi, np.inf)))
+
+    def slide(self, player_x, player_y, dx, dy, player_radius):
+        # Move the player circle by (dx, dy) one axis at a time, each axis
+        # stopping CONTACT_GAP short of the first obstacle in its way, so a
+        # blocked axis leaves the other free to slide along the obstacle's
+        # edge. Returns where the player ends up.
+        for step_x, step_y in ((dx, 0.0), (0.0, dy)):
+            if not (step_x or step_y):
+                continue
+            toi = self.sweep(player_x, player_y, step_x, step_y, player_radius)
+            if toi <= 1:
+                t = max(0.0, toi - CONTACT_GAP / abs(step_x or step_y))
+                step_x *= t
+                step_y *= t
+            player_x += step_x
+            player_y += step_y
+        return player_x, player_y
+
+    def check_collision(self, player_x, player_y, player_radius):
+        # Check if the player circle overlaps any obstacle; only the ones
+        # whose bounding box overlaps the circle's get the distance test
+        if self.grid is not None:
+            return len(self.grid.query_circle_rects(player_x, player_y, player_radius,
+                                                    self.x, self.y, self.width, self.height)) > 0
+        ids = self._near(player_x - player_radius, player_y - player_radius,
+                         player_x + player_radius, player_y + player_radius)
+        if len(ids) == 0:
+            return False
+        closest_x = np.clip(player_x, self.x[ids], self.x[ids] + self.width[ids])
+        closest_y = np.clip(player_y, self.y[ids], self.y[ids] + self.height[ids])
+        dx = player_x - closest_x
+        dy = player_y - closest_y
+        return bool(np.any(dx * dx + dy * dy < player_radius * player_radius))
+
+
+# Capture effect particles from every active burst
+class ParticleStore:
+    # Fixed-capacity pool: the first `count` slots of every array are live
+    # particles, so bursts reuse the same buffers instead of allocating, and
+    # expired particles are swap-removed by moving live ones from the tail
+    # into their slots.
+    __slots__ = ('capacity', 'count', 'x', 'y', 'dx', 'dy', 'size', 'life', 'color', 'scratch')
+
+    def __init__(self, capacity=MAX_PARTICLES):
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.dx = np.zeros(capacity)
+        self.dy = np.zeros(capacity)
+        self.size = np.zeros(capacity)
+        self.life = np.zeros(capacity)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.scratch = np.zeros(capacity)
+
+    def __len__(self):
+        return self.count
+
+    def emit(self, x, y, color, count=10, lifetime=30, rng=random):
+        # Burst of particles flying out from (x, y); once the pool is full the
+        # rest of the burst is dropped. Random values are drawn straight into
+        # the pool's slots, with the speeds parked in the size slots until
+        # they have scaled the directions.
+        start = self.count
+        count = min(count, self.capacity - start)
+        if count <= 0:
+            return
+        end = start + count
+        angle = self.scratch[:count]
+        dx = self.dx[start:end]
+        dy = self.dy[start:end]
+        size = self.size[start:end]
+        uniform = rng.uniform
+        for i in range(count):
+            angle[i] = uniform(0, math.pi * 2)
+        for i in range(count):
+            size[i] = uniform(1, 3)
+        np.cos(angle, out=dx)
+        np.sin(angle, out=dy)
+        dx *= size
+        dy *= size
+        randint = rng.randint
+        for i in range(count):
+            size[i] = randint(2, 5)
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.life[start:end] = lifetime
+        self.color[start:end] = color
+        self.count = end
+
+    def update(self, frames=1.0):
+        n = self.count
+        scratch = self.scratch[:n]
+        self.x[:n] += np.multiply(self.dx[:n], frames, out=scratch)
+        self.y[:n] += np.multiply(self.dy[:n], frames, out=scratch)
+        self.size[:n] *= 0.95 ** frames
+        self.life[:n] -= frames
+
+        # Drop particles whose burst has run its course
+        if n and self.life[:n].min() <= 0:
+            self._remove(np.flatnonzero(self.life[:n] <= 0))
+
+    def _remove(self, dead):
+        # Fill the holes left below the new end with the live particles above it
+        n = self.count - len(dead)
+        holes = dead[dead < n]
+        if len(holes):
+            tail = np.flatnonzero(self.life[n:self.count] > 0) + n
+            for array in (self.x, self.y, self.dx, self.dy, self.size, self.life, self.color):
+                array[holes] = array[tail]
+        self.count = n
+
+    def clear(self):
+        self.count = 0
@@ -0,0 +1,184 @@
+# Difficulty parameter sweeps
+#
+# Plays the same seeded games with the scripted bot under every combination
+# of the Difficulty values given on the command line, in parallel, and
+# reports how many levels the bot gets through and how long levels take to
+# clear under each. Every finished game is appended to an on-disk cache
+# keyed by a hash of its rules, so re-running a sweep only plays games
+# it has not seen: adding grid values or raising --games reuses everything
+# already played. Games follow the rules of the chosen preset with only its
+# difficulty swept.
+#
+# Usage: python -m flag_catcher.sweep [--preset NAME] --set max_obstacles=3,5,8 --set flag_speed_per_level=0.1,0.2
+import argparse
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from .levels import DEFAULT_DIFFICULTY, check_difficulty
+from .presets import DEFAULT_PRESET, DEFAULT_RULES, PRESETS
+from .runner import aggregate, play
+from .sim import ENGINE_VERSION, TICK_MS
+
+# Bump whenever the bot or what a result records changes, so stale cached
+# games are not reused. Changes to how games play out are covered by
+# ENGINE_VERSION, which is part of every key.
+CACHE_VERSION = 3
+
+CACHE_DIR = '.sweep_cache'
+
+
+def config_hash(rules, dt=TICK_MS):
+    key = {'version': CACHE_VERSION, 'engine': ENGINE_VERSION,
+           'rules': rules._replace(difficulty=rules.difficulty._asdict())._asdict(), 'dt': dt}
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class SweepCache:
+    # One JSON-lines file of game results per rules hash
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+        self.files = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, key + '.jsonl')
+
+    def load(self, key):
+        # Returns {seed: result} for every game cached under key
+        results = {}
+        try:
+            with open(self.path(key)) as cache_file:
+                for line in cache_file:
+                    try:
+                        result = json.loads(line)
+                    except ValueError:
+                        continue  # A line cut short by an interrupted run
+                    results[result['seed']] = result
+        except FileNotFoundError:
+            pass
+        return results
+
+    def add(self, key, result):
+        cache_file = self.files.get(key)
+        if cache_file is None:
+            cache_file = self.files[key] = open(self.path(key), 'a')
+        cache_file.write(json.dumps(result) + '\n')
+        cache_file.flush()
+
+    def close(self):
+        for cache_file in self.files.values():
+            cache_file.close()
+        self.files.clear()
+
+
+# Every Difficulty in the grid, with the default for each knob not swept.
+# grid maps field names to lists of values.
+def expand_grid(grid, base=DEFAULT_DIFFICULTY):
+    names = list(grid)
+    return [base._replace(**dict(zip(names, values))) for values in itertools.product(*grid.values())]
+
+
+def _play_task(task):
+    key, rules, seed = task
+    return key, play(seed, rules=rules)
+
+
+# Play whatever games the cache is missing and return one summary per
+# difficulty, in grid order
+def sweep(difficulties, seeds, workers=None, cache=None, progress=None, rules=DEFAULT_RULES):
+    cache = cache or SweepCache()
+    configs = [rules._replace(difficulty=difficulty) for difficulty in difficulties]
+    keys = [config_hash(config) for config in configs]
+    known = {key: cache.load(key) for key in set(keys)}
+    tasks = []
+    for key, config in dict(zip(keys, configs)).items():
+        tasks += [(key, config, seed) for seed in seeds if seed not in known[key]]
+
+    try:
+        if tasks:
+            with multiprocessing.Pool(workers) as pool:
+                for done, (key, result) in enumerate(pool.imap_unordered(_play_task, tasks), 1):
+                    known[key][result['seed']] = result
+                    cache.add(key, result)
+                    if progress:
+                        progress(done, len(tasks))
+    finally:
+        cache.close()
+
+    summaries = []
+    for key, difficulty in zip(keys, difficulties):
+        summary = aggregate(known[key][seed] for seed in seeds)
+        summaries.append({'config': key, 'difficulty': difficulty._asdict(), **summary})
+    return summaries
+
+
+def parse_setting(text):
+    # 'name=v1,v2,...' -> (name, [values]) typed like the default value
+    name, _, values = text.partition('=')
+    if name not in DEFAULT_DIFFICULTY._fields or not values:
+        raise argparse.ArgumentTypeError(
+            f"expected NAME=V1,V2,... with NAME one of: {', '.join(DEFAULT_DIFFICULTY._fields)}")
+    kind = type(getattr(DEFAULT_DIFFICULTY, name))
+    try:
+        return name, [kind(value) for value in values.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{name} takes {kind.__name__} values") from None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep difficulty parameters with headless bot games")
+    parser.add_argument("--set", dest="settings", action="append", type=parse_setting, default=[],
+                        metavar="NAME=V1,V2", help="difficulty knob and the values to try; repeatable")
+    parser.add_argument("--preset", choices=PRESETS, default=DEFAULT_PRESET,
+                        help="rules to play by; its difficulty is the base of the grid (default: %(default)s)")
+    parser.add_argument("--games", type=int, default=100, help="games per configuration (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game (default: %(default)s)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--cache", default=CACHE_DIR, help="cache directory (default: %(default)s)")
+    parser.add_argument("--output", metavar="FILE", help="write the summaries as JSON to this file")
+    args = parser.parse_args(argv)
+    if args.games < 1:
+        parser.error("argument --games: must be at least 1")
+    if args.workers is not None and args.workers < 1:
+        parser.error("argument --workers: must be at least 1")
+
+    grid = dict(args.settings)
+    rules = PRESETS[args.preset]
+    difficulties = expand_grid(grid, rules.difficulty)
+    # Refuse unplayable settings here rather than in a worker process
+    for difficulty in difficulties:
+        try:
+            check_difficulty(difficulty)
+        except ValueError as error:
+            parser.error(f"argument --set: {error}")
+    seeds = range(args.seed, args.seed + args.games)
+
+    def progress(done, total):
+        if done % 50 == 0 or done == total:
+            print(f"{done}/{total} games played", file=sys.stderr)
+
+    start = time.perf_counter()
+    summaries = sweep(difficulties, seeds, args.workers, SweepCache(args.cache), progress, rules)
+    print(f"Swept {len(difficulties)} configurations in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    header = ''.join(f"{name:>26}" for name in grid) + f"{'cleared':>9}{'score':>9}{'clear s':>9}"
+    print(header)
+    for summary in summaries:
+        clear = summary['clear_time_mean']
+        print(''.join(f"{summary['difficulty'][name]:>26}" for name in grid)
+              + f"{summary['level_mean'] - 1:>9.2f}{summary['score_mean']:>9.0f}"
+              + (f"{clear:>9.2f}" if clear is not None else f"{'-':>9}"))
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(summaries, output, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
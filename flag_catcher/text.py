@@ -0,0 +1,39 @@
+# Cache of rendered text Surfaces
+#
+# HUD strings change a few times a second at most, so rasterizing them with
+# font.render every frame is wasted work. Surfaces are kept per
+# (font, text, colour) in a size-bounded least-recently-used cache.
+from collections import OrderedDict
+
+# Enough for every HUD and game-over string plus a few seconds of timer values
+MAX_ENTRIES = 256
+
+
+class TextCache:
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    # Same arguments as font.render, with the font in front
+    def render(self, font, text, antialias, color):
+        key = (font, text, antialias, color)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.entries[key] = surface
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)  # Evict the least recently used
+        return surface
+
+    def clear(self):
+        self.entries.clear()
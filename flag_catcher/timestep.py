@@ -0,0 +1,33 @@
+# Fixed-timestep accumulator for decoupling simulation rate from render rate
+from .sim import TICK_MS
+
+# Longest frame the accumulator will absorb; anything beyond is dropped so a
+# stall (window drag, breakpoint) doesn't trigger a long burst of catch-up ticks
+MAX_FRAME_MS = 250
+
+
+class FixedTimestep:
+    def __init__(self, tick_ms=TICK_MS, max_frame_ms=MAX_FRAME_MS):
+        self.tick_ms = tick_ms
+        self.max_frame_ms = max_frame_ms
+        self.accumulator = 0.0
+
+    def advance(self, frame_ms):
+        # Bank the elapsed real time and return how many whole ticks to run
+        self.accumulator += min(frame_ms, self.max_frame_ms)
+        ticks = int(self.accumulator // self.tick_ms)
+        self.accumulator -= ticks * self.tick_ms
+        return ticks
+
+    def reset(self):
+        self.accumulator = 0.0
+
+    @property
+    def alpha(self):
+        # How far the renderer is between the last two simulation ticks
+        return self.accumulator / self.tick_ms
+
+
+# Linear interpolation between the previous and current tick
+def lerp(prev, current, alpha):
+    return prev + (current - prev) * alpha
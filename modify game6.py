@@ -1,242 +1,11 @@
-import pygame
-import sys
-import random
-import math
-
-# Initialize pygame
-pygame.init()
-
-# Set up display dimensions
-WINDOW_WIDTH = 700
-WINDOW_HEIGHT = 800
-PLAYING_AREA = 600
-
-# Colors
-BLACK = (0, 0, 0)
-RED = (255, 0, 0)
-BROWN = (139, 69, 19)
-GRAY = (100, 100, 100)
-WHITE = (255, 255, 255)
-LIGHT_BLUE = (173, 216, 230)
-FLAG_COLORS = [
-    (255, 255, 0),    # Yellow
-    (0, 255, 0),      # Green
-    (0, 0, 255),      # Blue
-    (255, 0, 255),    # Magenta
-    (0, 255, 255),    # Cyan
-    (255, 165, 0)     # Orange
-]
-
-# Set up the display
-screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-pygame.display.set_caption("Flag Catcher Game")
-
-# Flag properties
-class Flag:
-    def __init__(self, x, y, color):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.captured = False
-        self.speed_x = random.uniform(-1.5, 1.5)
-        self.speed_y = random.uniform(-1.5, 1.5)
-    
-    def draw(self):
-        if not self.captured:
-            # Draw flag pole (brown)
-            pygame.draw.line(screen, BROWN, (self.x, self.y), (self.x, self.y - 30), 3)
-            
-            # Draw triangular flag
-            flag_points = [(self.x, self.y - 30), (self.x + 20, self.y - 20), (self.x, self.y - 10)]
-            pygame.draw.polygon(screen, self.color, flag_points)
-    
-    def move(self):
-        if not self.captured:
-            # Move the flag
-            self.x += self.speed_x
-            self.y += self.speed_y
-            
-            # Bounce off walls
-            if self.x < 20 or self.x > WINDOW_WIDTH - 20:
-                self.speed_x *= -1
-            if self.y < 40 or self.y > PLAYING_AREA - 10:
-                self.speed_y *= -1
-    
-    def check_capture(self, player_x, player_y, player_radius):
-        if not self.captured:
-            distance = ((player_x - self.x) ** 2 + (player_y - self.y) ** 2) ** 0.5
-            if distance < player_radius + 10:
-                self.captured = True
-                return True
-        return False
-
-# Butterfly net class
-class ButterflyNet:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.radius = 25
-        self.handle_length = 40
-        self.animation_frame = 0
-        self.animation_speed = 0.2
-    
-    def draw(self):
-        # Draw the net handle (brown)
-        pygame.draw.line(screen, BROWN, (self.x, self.y), 
-                         (self.x, self.y + self.handle_length), 5)
-        
-        # Draw the net rim (white)
-        pygame.draw.circle(screen, WHITE, (self.x, self.y), self.radius, 3)
-        
-        # Draw the net mesh (light blue with animation)
-        self.animation_frame += self.animation_speed
-        wave_offset = math.sin(self.animation_frame) * 3
-        
-        # Draw mesh lines
-        for i in range(0, 360, 30):
-            angle = math.radians(i)
-            end_x = self.x + (self.radius - 5) * math.cos(angle)
-            end_y = self.y + (self.radius - 5) * math.sin(angle) + wave_offset
-            pygame.draw.line(screen, LIGHT_BLUE, (self.x, self.y), (end_x, end_y), 1)
-        
-        # Draw inner circles for mesh effect
-        pygame.draw.circle(screen, LIGHT_BLUE, (self.x, self.y + wave_offset // 2), self.radius * 0.7, 1)
-        pygame.draw.circle(screen, LIGHT_BLUE, (self.x, self.y + wave_offset // 3), self.radius * 0.4, 1)
-
-# Function to create new flags
-def create_flags():
-    new_flags = []
-    for i in range(6):
-        flag_x = random.randint(30, WINDOW_WIDTH - 30)
-        flag_y = random.randint(30, PLAYING_AREA - 30)
-        new_flags.append(Flag(flag_x, flag_y, FLAG_COLORS[i]))
-    return new_flags
+# This version of the game is the "modify-game6" preset of the flag_catcher
+# package; see flag_catcher/presets.py for its rules.
+# Usage: python "modify game6.py" [--seed N] [--record FILE | --replay FILE] [--startup-report]
+import time
+launch_time = time.perf_counter()  # Startup is timed from here, imports included
 
-# Function to reset the game
-def reset_game():
-    global player_x, player_y, flags, score, start_time, game_over
-    player_x = WINDOW_WIDTH // 2
-    player_y = PLAYING_AREA // 2
-    flags = create_flags()
-    score = 0
-    start_time = pygame.time.get_ticks()
-    game_over = False
-
-# Player properties
-player_x = WINDOW_WIDTH // 2
-player_y = PLAYING_AREA // 2
-player_speed = 5
-player_radius = 25  # Capture radius
-
-# Create butterfly net
-net = ButterflyNet(player_x, player_y)
-
-# Create initial flags
-flags = create_flags()
-
-# Game variables
-score = 0
-font = pygame.font.SysFont(None, 36)
-large_font = pygame.font.SysFont(None, 72)
-start_time = pygame.time.get_ticks()
-game_duration = 60000  # 60 seconds in milliseconds
-game_over = False
-
-# Game loop
-clock = pygame.time.Clock()
-running = True
-
-while running:
-    # Handle events
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-    
-    # Get keyboard input
-    keys = pygame.key.get_pressed()
-    
-    # Check for reset key
-    if keys[pygame.K_r] and game_over:
-        reset_game()
-    
-    # Clear the screen
-    screen.fill(BLACK)
-    
-    # Draw separator line
-    pygame.draw.line(screen, GRAY, (0, PLAYING_AREA), (WINDOW_WIDTH, PLAYING_AREA), 2)
-    
-    if not game_over:
-        # Move the player based on arrow key presses
-        if keys[pygame.K_LEFT] and player_x - player_speed > player_radius:
-            player_x -= player_speed
-        if keys[pygame.K_RIGHT] and player_x + player_speed < WINDOW_WIDTH - player_radius:
-            player_x += player_speed
-        if keys[pygame.K_UP] and player_y - player_speed > player_radius:
-            player_y -= player_speed
-        if keys[pygame.K_DOWN] and player_y + player_speed < PLAYING_AREA - player_radius:
-            player_y += player_speed
-        
-        # Update net position
-        net.x = player_x
-        net.y = player_y
-        
-        # Check time remaining
-        current_time = pygame.time.get_ticks()
-        time_left = max(0, game_duration - (current_time - start_time))
-        if time_left == 0:
-            game_over = True
-        
-        # Move and check for flag captures
-        flags_captured = 0
-        for flag in flags:
-            flag.move()  # Move the flags
-            if flag.check_capture(player_x, player_y, player_radius):
-                score += 50
-            if flag.captured:
-                flags_captured += 1
-        
-        # Check if all flags are captured - generate new flags
-        if flags_captured == 6:
-            flags = create_flags()
-        
-        # Draw the flags
-        for flag in flags:
-            flag.draw()
-        
-        # Draw the butterfly net
-        net.draw()
-        
-        # Draw score at the bottom
-        score_text = font.render(f"Score: {score}", True, (255, 255, 255))
-        screen.blit(score_text, (50, PLAYING_AREA + (WINDOW_HEIGHT - PLAYING_AREA) // 2))
-        
-        # Draw timer at the bottom
-        timer_text = font.render(f"Time: {time_left // 1000}s", True, (255, 255, 255))
-        screen.blit(timer_text, (WINDOW_WIDTH - 150, PLAYING_AREA + (WINDOW_HEIGHT - PLAYING_AREA) // 2))
-        
-        # Draw flags remaining
-        flags_text = font.render(f"Flags: {6 - flags_captured}", True, (255, 255, 255))
-        screen.blit(flags_text, (WINDOW_WIDTH // 2 - 40, PLAYING_AREA + (WINDOW_HEIGHT - PLAYING_AREA) // 2))
-    else:
-        # Draw game over banner
-        game_over_text = large_font.render("GAME OVER", True, (255, 0, 0))
-        screen.blit(game_over_text, (WINDOW_WIDTH // 2 - 150, PLAYING_AREA // 2 - 50))
-        
-        # Draw final score
-        final_score_text = font.render(f"Final Score: {score}", True, (255, 255, 255))
-        screen.blit(final_score_text, (WINDOW_WIDTH // 2 - 80, PLAYING_AREA // 2 + 20))
-        
-        # Draw reset instruction
-        reset_text = font.render("Press 'R' to play again", True, (255, 255, 255))
-        screen.blit(reset_text, (WINDOW_WIDTH // 2 - 120, PLAYING_AREA // 2 + 60))
-    
-    # Update the display
-    pygame.display.flip()
-    
-    # Cap the frame rate
-    clock.tick(60)
+import sys
 
-# Quit pygame
-pygame.quit()
-sys.exit()
+from flag_catcher.game import main
 
+sys.exit(main(preset='modify-game6', launch_time=launch_time))
@@ -0,0 +1,37 @@
+# Batched games must follow the same level table as GameState, whatever
+# difficulty they are given
+import numpy as np
+import pytest
+
+from flag_catcher.batch import BatchEnv
+from flag_catcher.levels import DEFAULT_DIFFICULTY, level_config
+
+DIFFICULTIES = [
+    DEFAULT_DIFFICULTY,
+    DEFAULT_DIFFICULTY._replace(obstacles_from_level=2, obstacles_every=3, bonus_from_level=3, bonus_chance=0.5),
+]
+
+
+@pytest.mark.parametrize('difficulty', DIFFICULTIES)
+def test_level_ups_follow_the_level_table(difficulty):
+    env = BatchEnv(32, seed=7, difficulty=difficulty)
+    env.reset()
+    for level in range(2, 16):
+        sizes = env.obstacle_width.copy()
+        env.flag_captured[:] = True
+        env.step(np.zeros(env.num_envs, dtype=np.int64))
+        assert np.all(env.level == level)
+        config = level_config(level, difficulty)
+        counts = np.count_nonzero(env.obstacle_present, axis=1)
+        assert np.all(counts <= config.obstacles)
+        if config.new_obstacles:
+            assert counts.max() > 0 or config.obstacles == 0
+        else:
+            assert np.array_equal(env.obstacle_width, sizes)
+        bonus = env.flag_points > 50
+        assert bonus.any() == (config.bonus_chance > 0)
+
+
+def test_unplayable_difficulty_is_refused():
+    with pytest.raises(ValueError, match='obstacles_every'):
+        BatchEnv(4, difficulty=DEFAULT_DIFFICULTY._replace(obstacles_every=0))
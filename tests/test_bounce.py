@@ -0,0 +1,39 @@
+# Bouncing flags off walls, obstacles and each other only ever turns their
+# speeds, so a crowd has to keep its kinetic energy however long it runs
+import random
+
+import numpy as np
+import pytest
+
+from flag_catcher.sim import FLAG_RADIUS, create_flags
+from flag_catcher.store import ObstacleStore
+
+
+def kinetic_energy(flags):
+    return float(np.sum(flags.speed_x ** 2 + flags.speed_y ** 2))
+
+
+@pytest.mark.parametrize('count', [100, 200, 600])
+def test_crowd_keeps_its_energy(count):
+    flags = create_flags(10, count, rng=random.Random(count))
+    obstacles = ObstacleStore([100, 400], [100, 300], [80, 60], [60, 120], [0.5, -0.7], [0.3, 0.4])
+    energy = kinetic_energy(flags)
+    speed = np.median(np.hypot(flags.speed_x, flags.speed_y))
+    for _ in range(2000):
+        obstacles.move(0.5)
+        flags.move(0.5)
+        flags.bounce(obstacles, FLAG_RADIUS)
+    assert kinetic_energy(flags) == pytest.approx(energy, rel=1e-9)
+    # Still moving about rather than clumped up and stopped
+    assert np.median(np.hypot(flags.speed_x, flags.speed_y)) > 0.5 * speed
+
+
+def test_head_on_pair_swaps_speeds():
+    flags = create_flags(1, 2, rng=random.Random(0))
+    flags.x[:] = [300, 315]
+    flags.y[:] = [200, 200]
+    flags.speed_x[:] = [2.0, -1.0]
+    flags.speed_y[:] = [0.0, 0.0]
+    flags.bounce(ObstacleStore.empty(), FLAG_RADIUS)
+    assert flags.speed_x.tolist() == [-1.0, 2.0]
+    assert flags.x[1] - flags.x[0] == pytest.approx(2 * FLAG_RADIUS)
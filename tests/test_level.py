@@ -0,0 +1,63 @@
+# The next level is prepared while the current one is played, so the tick
+# that swaps it in must cost about what any other capture tick does, and
+# what it swaps in must be laid out as if it had been made on the spot
+import statistics
+import time
+
+import numpy as np
+import pytest
+
+from flag_catcher.presets import PRESETS
+from flag_catcher.runner import nearest_flag_bot
+from flag_catcher.sim import FIT_MARGIN, FLAG_RADIUS, OBSTACLE_SPACING, GameState, step
+from flag_catcher.spawn import box_distance
+
+PREPARED = sorted(name for name, rules in PRESETS.items() if rules.on_clear in ('level', 'respawn'))
+
+
+def test_level_up_tick_costs_about_a_capture_tick():
+    level_ups, captures = [], []
+    for seed in range(15):
+        state = GameState(seed)
+        while not state.game_over:
+            keys = nearest_flag_bot(state)
+            start = time.perf_counter_ns()
+            events = step(state, keys)
+            elapsed = time.perf_counter_ns() - start
+            kinds = {event[0] for event in events}
+            if 'level_up' in kinds:
+                level_ups.append(elapsed)
+            elif 'capture' in kinds:
+                captures.append(elapsed)
+    assert len(level_ups) > 100
+    assert statistics.median(level_ups) < 1.5 * statistics.median(captures)
+
+
+@pytest.mark.parametrize('preset', PREPARED)
+@pytest.mark.parametrize('wander', [0, FIT_MARGIN / 3, 4 * FIT_MARGIN])
+def test_prepared_level_is_laid_out_around_the_player(preset, wander):
+    state = GameState(3, PRESETS[preset])
+    state.level = 4  # Far enough in for obstacles and bonus flags in most presets
+    next_level = state.prepare_next_level()
+    while next_level.advance():
+        pass
+    assert next_level.flag_store is not None
+    next_level.fit(state, FIT_MARGIN)
+
+    state.player_x += wander
+    state.player_y -= wander
+    obstacles, flags = next_level.take(state)
+    obstacles = state.obstacles if obstacles is None else obstacles
+    layout = next_level.flags
+    assert len(flags) == layout.count == layout.config.flags - layout.dropped
+    assert np.all(np.hypot(flags.x - state.player_x, flags.y - state.player_y) >= state.player_clearance)
+    if len(flags) > 1:
+        spacing = np.hypot(flags.x[:, None] - flags.x, flags.y[:, None] - flags.y)
+        np.fill_diagonal(spacing, np.inf)
+        assert spacing.min() >= state.flag_spacing
+    if len(obstacles):
+        assert box_distance(flags.x[:, None], flags.y[:, None], 0, 0, obstacles.x, obstacles.y, obstacles.width,
+                            obstacles.height).min() >= FLAG_RADIUS
+    if next_level.obstacles is not None and len(obstacles):
+        assert box_distance(obstacles.x, obstacles.y, obstacles.width, obstacles.height, state.player_x,
+                            state.player_y, 0, 0).min() >= OBSTACLE_SPACING
@@ -0,0 +1,47 @@
+# Capture particles live in a fixed pool: expired ones must be swapped out
+# without disturbing the live ones, and a full pool must drop the overflow
+import random
+
+import numpy as np
+
+from flag_catcher.store import ParticleStore
+
+
+def live(particles):
+    n = len(particles)
+    return sorted(zip(particles.life[:n].tolist(), particles.color[:n, 0].tolist()))
+
+
+def test_expired_particles_are_swapped_out():
+    particles = ParticleStore(64)
+    rng = random.Random(1)
+    # Bursts with different lifetimes interleaved, so expiring ones leave
+    # holes below live ones at the tail
+    for burst, lifetime in enumerate([3, 9, 3, 6, 3, 9]):
+        particles.emit(100 * burst, 0, (burst, 0, 0), count=5, lifetime=lifetime, rng=rng)
+    before = live(particles)
+
+    particles.update(1)
+    particles.update(1)
+    particles.update(1)
+    assert len(particles) == 15
+    assert live(particles) == [(life - 3, color) for life, color in before if life > 3]
+    # Every survivor kept its own position too, a few frames' flight from its burst
+    n = len(particles)
+    assert np.all(np.abs(particles.x[:n] - 100 * particles.color[:n, 0].astype(int)) <= 9)
+
+    for _ in range(6):
+        particles.update(1)
+    assert len(particles) == 0
+
+
+def test_full_pool_drops_the_overflow():
+    particles = ParticleStore(12)
+    rng = random.Random(2)
+    particles.emit(10, 10, (1, 1, 1), count=10, rng=rng)
+    particles.emit(20, 20, (2, 2, 2), count=10, rng=rng)
+    assert len(particles) == 12
+    assert particles.color[:12, 0].tolist() == [1] * 10 + [2] * 2
+    particles.emit(30, 30, (3, 3, 3), count=10, rng=rng)
+    assert len(particles) == 12
+    assert 3 not in particles.color[:, 0]
@@ -0,0 +1,44 @@
+# Render detail must drop when frames run over budget, come back once they
+# have had headroom for a while, and every change must reach the listeners
+import pytest
+
+from flag_catcher.quality import HEADROOM, QUALITY_TIERS, UPGRADE_FRAMES, WINDOW, QualityController
+
+BUDGET = 10.0
+
+
+def feed(quality, work_ms, frames):
+    return [decision for decision in (quality.update(work_ms) for _ in range(frames)) if decision]
+
+
+def test_steps_down_and_back_up():
+    quality = QualityController(BUDGET)
+    heard = []
+    quality.add_listener(lambda tier, decision: heard.append((tier.name, decision)))
+
+    decisions = feed(quality, 2 * BUDGET, WINDOW)
+    assert [(d.old, d.new) for d in decisions] == [('high', 'medium')]
+    assert decisions[0].frame == WINDOW and decisions[0].frame_ms == 2 * BUDGET
+    assert feed(quality, 2 * BUDGET, 3 * WINDOW) and quality.tier is QUALITY_TIERS[-1]
+    assert feed(quality, 2 * BUDGET, 2 * WINDOW) == []  # Nothing below minimal
+
+    # Frames just under budget hold the tier; clear headroom brings detail back one tier at a time
+    assert feed(quality, BUDGET * (HEADROOM + 1) / 2, UPGRADE_FRAMES * 2) == []
+    decisions = feed(quality, BUDGET * HEADROOM / 2, WINDOW + UPGRADE_FRAMES - 1)
+    assert [(d.old, d.new) for d in decisions] == [('minimal', 'low')]
+
+    assert [name for name, _ in heard] == ['medium', 'low', 'minimal', 'low']
+    assert [decision for _, decision in heard] == quality.decisions
+
+
+def test_locked_tier_ignores_frame_times():
+    quality = QualityController(BUDGET)
+    heard = []
+    quality.add_listener(lambda tier, decision: heard.append(tier.name))
+    quality.lock('low')
+    assert feed(quality, 10 * BUDGET, 5 * WINDOW) == []
+    assert quality.tier.name == 'low' and heard == ['low']
+    quality.unlock()
+    assert feed(quality, 10 * BUDGET, WINDOW)[0].new == 'minimal'
+    with pytest.raises(ValueError):
+        quality.lock('ultra')
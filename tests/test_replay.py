@@ -0,0 +1,97 @@
+# Recording a game and fast-forwarding the file must land on the same state,
+# and files that cannot be replayed are reported rather than crashing
+import argparse
+
+import pytest
+
+from flag_catcher import game, replay
+from flag_catcher.presets import PRESETS
+from flag_catcher.replay import (HEADER, MAGIC, MAX_SEED, VERSION, ReplayError, ReplayReader, ReplayWriter,
+                                 parse_seed, simulate)
+from flag_catcher.sim import (ENGINE_VERSION, KEY_DOWN, KEY_LEFT, KEY_RIGHT, KEY_UP, TICK_MS, TICK_RATE, GameState,
+                              step)
+
+MOVES = [KEY_LEFT, KEY_LEFT | KEY_UP, KEY_UP, KEY_RIGHT, KEY_RIGHT | KEY_DOWN, KEY_DOWN, 0]
+
+
+def record(path, seed, rules, ticks):
+    state = GameState(seed, rules)
+    with ReplayWriter(path, seed, TICK_RATE, rules.name) as writer:
+        for tick in range(ticks):
+            keys = MOVES[tick // 37 % len(MOVES)]
+            writer.record(keys)
+            step(state, keys, TICK_MS)
+    return state
+
+
+@pytest.mark.parametrize('preset', ['import-pygame', 'modify-game4', 'next-level-modification', 'bouncing-flags'])
+def test_round_trip(tmp_path, preset):
+    path = tmp_path / 'game.fcrp'
+    recorded = record(path, 1234, PRESETS[preset], 3000)
+    replayed, ticks = simulate(path)
+    assert ticks == 3000
+    assert replayed.rules is recorded.rules
+    assert (replayed.score, replayed.level, replayed.tick) == (recorded.score, recorded.level, recorded.tick)
+    assert (replayed.player_x, replayed.player_y) == (recorded.player_x, recorded.player_y)
+    assert replayed.flags.captured.tolist() == recorded.flags.captured.tolist()
+
+
+def test_largest_seed_round_trips(tmp_path):
+    path = tmp_path / 'game.fcrp'
+    record(path, MAX_SEED, PRESETS['import-pygame'], 10)
+    with ReplayReader(path) as reader:
+        assert reader.seed == MAX_SEED
+
+
+@pytest.mark.parametrize('seed', [-1, MAX_SEED + 1])
+def test_seed_out_of_range(tmp_path, seed):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_seed(str(seed))
+    path = tmp_path / 'game.fcrp'
+    with pytest.raises(ReplayError):
+        ReplayWriter(path, seed)
+    assert not path.exists()
+
+
+@pytest.mark.parametrize('version, engine', [(1, 0), (2, 0), (VERSION, ENGINE_VERSION - 1)])
+def test_older_recordings_are_refused(tmp_path, version, engine):
+    path = tmp_path / 'game.fcrp'
+    path.write_bytes(HEADER.pack(MAGIC, version, engine, TICK_RATE, 1) + bytes((13,)) + b'import-pygame')
+    with pytest.raises(ReplayError):
+        ReplayReader(path)
+
+
+def test_refused_recordings_are_closed(tmp_path, monkeypatch):
+    path = tmp_path / 'game.fcrp'
+    path.write_bytes(b'not a replay at all')
+    opened = []
+
+    def tracking_open(*args):
+        opened.append(open(*args))
+        return opened[-1]
+    monkeypatch.setattr(replay, 'open', tracking_open, raising=False)
+    with pytest.raises(ReplayError):
+        ReplayReader(path)
+    assert len(opened) == 1 and opened[0].closed
+
+
+@pytest.mark.parametrize('main', [replay.main, game.main])
+@pytest.mark.parametrize('contents', [None, b'FCRP', b'not a replay at all'])
+def test_bad_replays_are_reported(tmp_path, capsys, main, contents):
+    path = tmp_path / 'game.fcrp'
+    if contents is not None:
+        path.write_bytes(contents)
+    with pytest.raises(SystemExit) as exit:
+        main([str(path)] if main is replay.main else ['--replay', str(path)])
+    assert exit.value.code == 2
+    assert str(path) in capsys.readouterr().err
+
+
+def test_damaged_body_is_reported(tmp_path, capsys):
+    path = tmp_path / 'game.fcrp'
+    record(path, 1, PRESETS['import-pygame'], 10)
+    path.write_bytes(path.read_bytes() + bytes((KEY_UP, 0x80)))
+    with pytest.raises(SystemExit) as exit:
+        replay.main([str(path)])
+    assert exit.value.code == 2
+    assert 'middle of a run' in capsys.readouterr().err
@@ -0,0 +1,109 @@
+# The spatial hash must only ever narrow down candidates: stores with the
+# grid enabled have to give the same answers as the brute-force tests.
+import random
+
+import numpy as np
+
+from flag_catcher.presets import PRESETS
+from flag_catcher.sim import GRID_MIN_FLAGS, GRID_MIN_OBSTACLES, GameState, create_flags, step
+from flag_catcher.spatial import SpatialHash
+from flag_catcher.store import ObstacleStore
+
+
+def random_obstacles(rng, count):
+    widths = rng.integers(20, 81, count)
+    heights = rng.integers(20, 81, count)
+    speeds = rng.uniform(-2, 2, (2, count))
+    return ObstacleStore(rng.uniform(0, 700 - widths), rng.uniform(0, 600 - heights), widths, heights,
+                         speeds[0], speeds[1])
+
+
+def test_candidates_cover_every_box_in_range():
+    rng = np.random.default_rng(1)
+    x = rng.uniform(-20, 720, 500)
+    y = rng.uniform(-20, 620, 500)
+    grid = SpatialHash()
+    grid.rebuild(x, y, x + 30, y + 30)
+    for _ in range(200):
+        min_x, min_y = rng.uniform(-50, 650, 2)
+        max_x, max_y = min_x + rng.uniform(0, 200), min_y + rng.uniform(0, 200)
+        found = set(grid.candidates(min_x, min_y, max_x, max_y).tolist())
+        inside = (x < max_x) & (x + 30 > min_x) & (y < max_y) & (y + 30 > min_y)
+        assert set(np.flatnonzero(inside).tolist()) <= found
+
+
+def test_grid_capture_matches_brute_force():
+    rng = np.random.default_rng(2)
+    plain = create_flags(5, 600, rng=random.Random(2))
+    gridded = create_flags(5, 600, rng=random.Random(2))
+    gridded.enable_grid()
+    player_x, player_y = 350.0, 300.0
+    for _ in range(300):
+        plain.move(1.0)
+        gridded.move(1.0)
+        dx, dy = rng.uniform(-8, 8, 2)
+        player_x = min(max(player_x + dx, 25), 675)
+        player_y = min(max(player_y + dy, 25), 575)
+        expected = plain.capture(player_x, player_y, 35, dx, dy)
+        assert np.array_equal(gridded.capture(player_x, player_y, 35, dx, dy), expected)
+    assert np.array_equal(gridded.captured, plain.captured)
+
+
+def test_grid_obstacle_queries_match_brute_force():
+    rng = np.random.default_rng(3)
+    plain = random_obstacles(rng, 50)
+    gridded = ObstacleStore(plain.x, plain.y, plain.width, plain.height, plain.speed_x, plain.speed_y)
+    gridded.enable_grid()
+    for _ in range(300):
+        plain.move(1.0)
+        gridded.move(1.0)
+        x, y = rng.uniform(0, 700), rng.uniform(0, 600)
+        dx, dy = rng.uniform(-10, 10, 2)
+        assert gridded.check_collision(x, y, 25) == plain.check_collision(x, y, 25)
+        assert gridded.slide(x, y, dx, dy, 25) == plain.slide(x, y, dx, dy, 25)
+
+
+def test_radius_query_matches_brute_force():
+    rng = np.random.default_rng(4)
+    x = rng.uniform(-20, 720, 2000)
+    y = rng.uniform(-20, 620, 2000)
+    grid = SpatialHash()
+    grid.rebuild(x, y)
+    for _ in range(200):
+        cx, cy = rng.uniform(-30, 730), rng.uniform(-30, 630)
+        radius = rng.uniform(0, 120)
+        expected = np.flatnonzero(np.hypot(x - cx, y - cy) < radius)
+        assert np.array_equal(grid.query_radius(cx, cy, radius, x, y), expected)
+
+
+def test_circle_rect_query_matches_brute_force():
+    rng = np.random.default_rng(5)
+    obstacles = random_obstacles(rng, 300)
+    x, y, w, h = obstacles.x, obstacles.y, obstacles.width, obstacles.height
+    grid = SpatialHash()
+    grid.rebuild(x, y, x + w, y + h)
+    for _ in range(200):
+        cx, cy = rng.uniform(-30, 730), rng.uniform(-30, 630)
+        radius = rng.uniform(0, 80)
+        gap = np.hypot(np.maximum(np.maximum(x - cx, cx - x - w), 0), np.maximum(np.maximum(y - cy, cy - y - h), 0))
+        assert np.array_equal(grid.query_circle_rects(cx, cy, radius, x, y, w, h), np.flatnonzero(gap < radius))
+
+
+def test_swarm_levels_play_the_same_on_the_grid():
+    difficulty = PRESETS['bouncing-flags'].difficulty._replace(
+        flags_per_level=2 * GRID_MIN_FLAGS, max_obstacles=GRID_MIN_OBSTACLES, obstacle_count_offset=-GRID_MIN_OBSTACLES,
+        obstacles_from_level=1, obstacle_min_size=10, obstacle_max_size=15)
+    rules = PRESETS['bouncing-flags']._replace(difficulty=difficulty, on_clear='end', game_duration=None)
+    gridded = GameState(7, rules)
+    plain = GameState(7, rules)
+    assert gridded.flags.grid is not None and gridded.obstacles.grid is not None
+    plain.flags.grid = plain.obstacles.grid = None
+    rng = np.random.default_rng(7)
+    for _ in range(60):
+        keys = int(rng.integers(0, 16))
+        for _ in range(20):
+            step(gridded, keys)
+            step(plain, keys)
+        assert (gridded.player_x, gridded.player_y, gridded.score) == (plain.player_x, plain.player_y, plain.score)
+    assert np.array_equal(gridded.flags.captured, plain.flags.captured)
+    assert gridded.score > 0
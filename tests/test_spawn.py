@@ -0,0 +1,75 @@
+# New flags and obstacles must spawn apart from each other and clear of the
+# player, and a crowded playing area must cost bounded time rather than hang
+import random
+import time
+
+import numpy as np
+import pytest
+
+from flag_catcher.presets import DEFAULT_RULES, PRESETS
+from flag_catcher.sim import (FLAG_RADIUS, MIN_FLAG_SPACING, OBSTACLE_SPACING, FlagLayout, GameState,
+                              create_flags, create_obstacles)
+from flag_catcher.spawn import box_distance
+
+PLAYER = (350, 300)
+SWARM = DEFAULT_RULES.difficulty._replace(obstacles_from_level=1, max_obstacles=60)
+
+
+def pair_distances(x, y, width=0, height=0):
+    width = np.broadcast_to(width, len(x))
+    height = np.broadcast_to(height, len(x))
+    distances = box_distance(x[:, None], y[:, None], width[:, None], height[:, None], x, y, width, height)
+    np.fill_diagonal(distances, np.inf)
+    return distances
+
+
+@pytest.mark.parametrize('spacing, count', [(MIN_FLAG_SPACING, 300), (40, 100)])
+def test_flags_keep_their_spacing(spacing, count):
+    flags = create_flags(count=count, rng=random.Random(spacing), spacing=spacing)
+    assert len(flags) == count
+    assert pair_distances(flags.x, flags.y).min() >= spacing
+
+
+def test_flags_spawn_clear_of_player_and_obstacles():
+    obstacles = create_obstacles(20, random.Random(1), SWARM, player=PLAYER)
+    assert len(obstacles)
+    flags = create_flags(count=500, rng=random.Random(1), spacing=MIN_FLAG_SPACING, clearance=80, player=PLAYER,
+                         obstacles=obstacles)
+    assert np.hypot(flags.x - PLAYER[0], flags.y - PLAYER[1]).min() >= 80
+    gaps = box_distance(flags.x[:, None], flags.y[:, None], 0, 0, obstacles.x, obstacles.y, obstacles.width,
+                        obstacles.height)
+    assert gaps.min() >= FLAG_RADIUS
+
+
+def test_obstacles_leave_room_to_pass():
+    obstacles = create_obstacles(20, random.Random(2), SWARM, player=PLAYER)
+    assert len(obstacles) > 1
+    assert pair_distances(obstacles.x, obstacles.y, obstacles.width, obstacles.height).min() >= OBSTACLE_SPACING
+
+
+@pytest.mark.parametrize('preset', sorted(PRESETS))
+def test_game_flags_spawn_out_of_reach(preset):
+    state = GameState(5, PRESETS[preset])
+    for _ in range(3):
+        state.player_x, state.player_y = state.rng.uniform(50, 650), state.rng.uniform(50, 550)
+        flags = state.spawn_flags()
+        assert np.hypot(flags.x - state.player_x, flags.y - state.player_y).min() >= state.player_clearance
+        if len(flags) > 1:
+            assert pair_distances(flags.x, flags.y).min() >= MIN_FLAG_SPACING
+
+
+def test_crowded_area_reports_the_shortfall():
+    layout = FlagLayout(1, 3000, random.Random(3), spacing=20)
+    while layout.add():
+        pass
+    flags = layout.store()
+    assert 0 < len(flags) < 3000
+    assert layout.count == len(flags)
+    assert layout.dropped == 3000 - len(flags)
+
+
+def test_thousands_spawn_in_bounded_time():
+    start = time.perf_counter()
+    assert len(create_flags(count=5000, rng=random.Random(4))) == 5000
+    create_flags(count=3000, rng=random.Random(4), spacing=20)
+    assert time.perf_counter() - start < 2
@@ -0,0 +1,36 @@
+# Cached sweep results must not outlive the rules they were played under,
+# and settings no game can be played with are refused before any is started
+import pytest
+
+from flag_catcher import sweep
+from flag_catcher.levels import check_difficulty
+from flag_catcher.presets import DEFAULT_RULES, PRESETS
+
+
+def test_engine_version_changes_the_cache_key(monkeypatch):
+    key = sweep.config_hash(DEFAULT_RULES)
+    monkeypatch.setattr(sweep, 'ENGINE_VERSION', sweep.ENGINE_VERSION + 1)
+    assert sweep.config_hash(DEFAULT_RULES) != key
+
+
+def test_cache_key_follows_the_rules():
+    difficulty = DEFAULT_RULES.difficulty._replace(max_obstacles=DEFAULT_RULES.difficulty.max_obstacles + 1)
+    assert sweep.config_hash(DEFAULT_RULES) != sweep.config_hash(DEFAULT_RULES._replace(difficulty=difficulty))
+    assert sweep.config_hash(DEFAULT_RULES) == sweep.config_hash(DEFAULT_RULES._replace())
+
+
+def test_presets_are_playable():
+    for rules in PRESETS.values():
+        check_difficulty(rules.difficulty)
+
+
+@pytest.mark.parametrize('setting', ['obstacles_every=0', 'obstacle_min_size=70', 'bonus_chance=1.5',
+                                     'flag_speed=nan', 'obstacle_max_size=600', 'flags_per_level=0,6'])
+def test_unplayable_settings_are_refused_up_front(tmp_path, monkeypatch, capsys, setting):
+    def play_nothing(*args, **kwargs):
+        raise AssertionError("games were started")
+    monkeypatch.setattr(sweep, 'sweep', play_nothing)
+    with pytest.raises(SystemExit) as exit:
+        sweep.main(['--set', setting, '--cache', str(tmp_path)])
+    assert exit.value.code == 2
+    assert setting.partition('=')[0] in capsys.readouterr().err
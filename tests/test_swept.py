@@ -0,0 +1,85 @@
+# Times of impact checked against distances sampled along the paths: at the
+# time of impact the two must touch, and at no sampled moment before it may
+# they overlap
+import numpy as np
+
+from flag_catcher.swept import sweep_circle_rect, sweep_circle_rect_x, sweep_circles, sweep_point_box
+
+CASES = 4000
+SAMPLES = np.linspace(0.0, 1.0, 1001)[:, None]
+TOLERANCE = 1e-6
+
+
+def check(toi, distance, radius):
+    # distance(t) gives the gap between the shapes at times t, one row per
+    # time and one column per case
+    assert np.all((toi == np.inf) | ((toi >= 0) & (toi <= 1)))
+    hit = np.isfinite(toi)
+    at_impact = distance(np.where(hit, toi, 0.0)[None, :])[0]
+    assert np.all(at_impact[hit] <= radius[hit] + TOLERANCE)
+    before = SAMPLES < toi[None, :]
+    assert np.all((distance(SAMPLES) >= radius - TOLERANCE) | ~before)
+    # A miss reported where the sampled paths plainly overlap would be wrong
+    # too; grazes between samples are what the exact test is for
+    assert np.all(np.any(distance(SAMPLES) < radius - 0.01, axis=0) <= hit)
+
+
+def box_gap(x, y, left, top, right, bottom):
+    dx = np.maximum(np.maximum(left - x, x - right), 0.0)
+    dy = np.maximum(np.maximum(top - y, y - bottom), 0.0)
+    return np.hypot(dx, dy)
+
+
+def random_circles(rng):
+    return rng.uniform(-50, 50, (8, CASES)), rng.uniform(1, 30, CASES)
+
+
+def random_rects(rng):
+    left = rng.uniform(-40, 20, CASES)
+    top = rng.uniform(-40, 20, CASES)
+    return left, top, rng.uniform(0, 40, CASES), rng.uniform(0, 40, CASES)
+
+
+def test_sweep_circles():
+    rng = np.random.default_rng(0)
+    (ax, ay, adx, ady, bx, by, bdx, bdy), reach = random_circles(rng)
+    toi = sweep_circles(ax, ay, adx, ady, bx, by, bdx, bdy, reach)
+    check(toi, lambda t: np.hypot(ax + t * adx - bx - t * bdx, ay + t * ady - by - t * bdy), reach)
+
+
+def test_sweep_point_box():
+    rng = np.random.default_rng(1)
+    (x, y, dx, dy, *_), _ = random_circles(rng)
+    left, top, width, height = random_rects(rng)
+    right, bottom = left + width, top + height
+    toi = sweep_point_box(x, y, dx, dy, left, top, right, bottom)
+
+    def inside(t):
+        px, py = x + t * dx, y + t * dy
+        return (px > left) & (px < right) & (py > top) & (py < bottom)
+    hit = np.isfinite(toi)
+    assert np.all(np.any(inside(SAMPLES), axis=0) <= hit)
+    assert not np.any(inside(SAMPLES) & (SAMPLES < toi - 1e-9))
+
+
+def test_sweep_circle_rect():
+    rng = np.random.default_rng(2)
+    (x, y, dx, dy, _, _, rdx, rdy), radius = random_circles(rng)
+    left, top, width, height = random_rects(rng)
+    toi = sweep_circle_rect(x, y, dx, dy, radius, left, top, width, height, rdx, rdy)
+    check(toi, lambda t: box_gap(x + t * dx, y + t * dy, left + t * rdx, top + t * rdy,
+                                 left + width + t * rdx, top + height + t * rdy), radius)
+
+
+def test_sweep_circle_rect_axis_moves():
+    rng = np.random.default_rng(3)
+    (x, y, dx, dy, *_), radius = random_circles(rng)
+    left, top, width, height = random_rects(rng)
+    toi = sweep_circle_rect_x(x, y, dx, radius, left, top, width, height)
+    check(toi, lambda t: box_gap(x + t * dx, y, left, top, left + width, top + height), radius)
+    toi = sweep_circle_rect_x(y, x, dy, radius, top, left, height, width)
+    check(toi, lambda t: box_gap(x, y + t * dy, left, top, left + width, top + height), radius)
+    # The axis test must agree with the general one
+    general = sweep_circle_rect(x, y, dx, 0.0, radius, left, top, width, height)
+    axis = sweep_circle_rect_x(x, y, dx, radius, left, top, width, height)
+    assert np.allclose(general, axis)